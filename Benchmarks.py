@@ -0,0 +1,583 @@
+"""
+Benchmarks for the hot paths of the engine (parsing, classifying, ect.)
+Run every benchmark with 'python Benchmarks.py', or just the ones
+named, such as 'python Benchmarks.py classify'.
+Date: 10/18/26
+"""
+from Parser import classify, chain_classify, NOUNS, VERBS, ADJECTIVES, CONJUNCS, QUOTES
+from Parser import Lexer, RegexLexer
+from Parser import decompose, NOUN_PREFIXES, NOUN_SUFFIXES, VERB_PREFIXES, VERB_SUFFIXES, ADJECTIVE_PREFIXES
+from Deconstructor import Deconstructor
+from Tools import Room, Item, Container, Player, DIRECTIONS
+import Save
+import Journal
+import MapCompiler
+import Generator
+import worldParser
+from Game import GameEngine, go_command
+from testGame import build_world
+import vocabParser
+import Parser
+import tracemalloc
+import gc
+import tempfile
+import copy
+import os
+import io
+import random
+import time
+import sys
+
+#Affixes that can be put on the roots to make the corpus
+PREFIXES = ['', '', 're', 'ra', 'ti', 'lo', 'ko', 'bi', 'ba']
+SUFFIXES = ['', '', 'ni', 'ga', 'ge', 'goe', 'ka', 'ke', 'bi', 'be', 'bo', 'la']
+
+#Makes a list of random sentences out of words in the vocabulary
+def make_corpus(size, seed=0):
+    rand = random.Random(seed) #Same corpus every run
+    roots = list(NOUNS) + list(VERBS) + list(ADJECTIVES)
+    grammar = list(CONJUNCS) + list(QUOTES) + ['a']
+
+    def word():
+        if rand.random() < 0.1: #Some grammar words
+            return rand.choice(grammar)
+
+        return rand.choice(PREFIXES) + rand.choice(roots) + rand.choice(SUFFIXES)
+
+    return [' '.join(word() for _ in range(rand.randint(2, 12))) for _ in range(size)]
+
+#Makes a list of random (well formed) commands, like a player would type
+def make_commands(size, seed=0):
+    rand = random.Random(seed) #Same commands every run
+    #Only use roots that don't look like they have affixes on them already
+    nouns = [w for w in NOUNS if decompose(w, NOUN_PREFIXES, NOUN_SUFFIXES)[0] == w]
+    verbs = [w for w in VERBS if decompose(w, VERB_PREFIXES, VERB_SUFFIXES)[0] == w]
+    adjectives = [w for w in ADJECTIVES if decompose(w, ADJECTIVE_PREFIXES, ())[0] == w]
+
+    def noun_phrase(marker):
+        phrase = rand.choice(nouns) + rand.choice(['', 'ni', 'ge']) + marker
+
+        if rand.random() < 0.3: #Describe the noun
+            phrase += ' ' + rand.choice(['', 'bi', 'lo']) + rand.choice(adjectives)
+
+        return phrase
+
+    def command():
+        parts = [noun_phrase('ka')] if rand.random() < 0.8 else []
+
+        if rand.random() < 0.3: #Has an indirect object
+            parts.append(noun_phrase('ke'))
+
+        return ' '.join(parts + [rand.choice(['', 'lo']) + rand.choice(verbs) + 'be'])
+
+    return [command() for _ in range(size)]
+
+#Makes the text of a vocabulary file with entries number of words in it
+def make_vocab(entries, seed=0):
+    rand = random.Random(seed) #Same vocabulary every run
+    letters = "abdegijklmnoprstx"
+    lines = ['SET "alphabet" = {};'.format(letters)]
+
+    for field in range(0, entries, 500): #Split the words up into fields
+        words = ['\t{}: "meaning number {}"'.format(''.join(rand.choice(letters) for _ in range(rand.randint(2, 9))), n)
+                 for n in range(field, min(field + 500, entries))]
+        lines.append('#Field number {}\nSTART "field {}":\n{}\nEND'.format(field, field, ',\n'.join(words)))
+
+    return '\n'.join(lines)
+
+#Returns the best time (out of repeat runs) of running func on every line
+def timed(func, corpus, repeat=3):
+    best = None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in corpus:
+            func(line)
+
+        took = time.perf_counter() - start
+        best = took if best == None else min(best, took)
+
+    return best
+
+#Prints the results of a benchmark in a table
+def report(name, count, unit, results):
+    print("{} ({} {})".format(name, count, unit))
+    base = results[0][1] #First result is what is compared against
+
+    for label, took in results:
+        print("  {:<20}{:>10.3f}s {:>12.0f} {}/s {:>8.1f}x".format(
+            label, took, count / took, unit, base / took))
+
+def bench_classify(size=20000):
+    """Compares the generator chain against the compiled word classes (both with the
+    same lexer, so only classifying is compared)."""
+    corpus = make_corpus(size)
+
+    report("classify", len(corpus), "lines", [
+        ('chain_classify', timed(lambda line: list(chain_classify(line)[0]), corpus)),
+        ('classify', timed(lambda line: list(classify(line, Lexer)[0]), corpus)),
+    ])
+
+def bench_deconstruct(size=20000, processes=4):
+    """Compares deconstructing commands one at a time against in a batch."""
+    corpus = make_commands(size)
+
+    report("deconstruct", len(corpus), "lines", [
+        ('Deconstructor', timed(lambda line: Deconstructor(line).deconstruct(), corpus)),
+        ('deconstruct_many', timed(lambda lines: list(Deconstructor.deconstruct_many(lines)), [corpus])),
+        ('{} processes'.format(processes),
+         timed(lambda lines: list(Deconstructor.deconstruct_many(lines, processes)), [corpus])),
+    ])
+
+def bench_vocab(entries=50000):
+    """Compares the character by character vocabulary lexer against the regex one."""
+    text = make_vocab(entries)
+
+    report("vocab lexer", entries, "entries", [
+        ('Lexer', timed(lambda text: vocabParser.Lexer(text).get_tokens(), [text])),
+        ('ScanLexer', timed(lambda text: vocabParser.ScanLexer(text).get_tokens(), [text])),
+    ])
+
+    report("vocab parse", entries, "entries", [
+        ('Lexer', timed(lambda text: vocabParser.Parser(text, vocabParser.Lexer).parse(), [text])),
+        ('ScanLexer', timed(lambda text: vocabParser.Parser(text, vocabParser.ScanLexer).parse(), [text])),
+    ])
+
+def bench_lexer(size=2000, sentences=40):
+    """Compares the character by character Mouthful lexer against the regex one."""
+    commands = make_commands(size * sentences)
+    #Long paragraphs, a few sentences to each line
+    corpus = ['\n'.join(' '.join(commands[n:n + 4]) for n in range(start, start + sentences, 4))
+              for start in range(0, len(commands), sentences)]
+
+    report("mouthful lexer", len(corpus), "paragraphs", [
+        ('Lexer', timed(lambda text: Lexer(text).get_tokens(), corpus)),
+        ('RegexLexer', timed(lambda text: RegexLexer(text).get_tokens(), corpus)),
+    ])
+
+#Classes of the abstract syntax tree (and the token), which all use slots
+AST_CLASSES = ['Token', 'Sentence', 'Conjunction', 'NounPhrase', 'Noun', 'Adjective',
+               'VerbPhrase', 'Verb', 'Quote', 'Adverb', 'NoOp']
+
+#Parses the lines, returns the time, and the bytes per sentence kept and at peak
+def measure_parse(corpus):
+    parse_all = lambda lines: [Parser.Parser(line).parse_all() for line in lines]
+    parse_all(corpus) #Warm up the affix cache first
+
+    took = timed(parse_all, [corpus])
+
+    tracemalloc.start()
+    trees = parse_all(corpus) #Keep the trees around to see their size
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return took, held / len(corpus), peak / len(corpus)
+
+def bench_ast(size=20000):
+    """Compares memory used by the slotted syntax tree against one with instance dicts."""
+    corpus = make_commands(size)
+    slotted = measure_parse(corpus)
+
+    #Swap in subclasses that have an instance dict, like the classes used to be
+    originals = {name: getattr(Parser, name) for name in AST_CLASSES}
+    for name, cls in originals.items():
+        setattr(Parser, name, type(name, (cls,), {}))
+
+    try:
+        with_dicts = measure_parse(corpus)
+
+    finally: #Put the real classes back
+        for name, cls in originals.items():
+            setattr(Parser, name, cls)
+
+    print("syntax tree ({} sentences)".format(size))
+    for label, (took, held, peak) in [('instance dicts', with_dicts), ('slots', slotted)]:
+        print("  {:<20}{:>10.3f}s {:>10.0f} bytes/sentence kept {:>10.0f} bytes/sentence peak".format(
+            label, took, held, peak))
+
+#Makes an engine in a room full of containers, each with an event waiting for a key
+def make_event_room(containers, depends):
+    game = GameEngine()
+    game.player = Player()
+    game.current_room = Room('room')
+    key = Item('key')
+
+    for n in range(containers):
+        box = Container('box', attributes=[str(n)])
+        box.make_event(lambda self: key in self.items, lambda self, engine: None, depends)
+        game.current_room.add_items(box)
+
+    return game
+
+def bench_events(containers=2000, turns=200):
+    """Compares checking every event each turn against only the ones that depend on a change."""
+    results = []
+
+    for label, depends in [('polled', None), ('depends', ['items'])]:
+        game = make_event_room(containers, depends)
+        boxes = list(game.current_room.items)
+        key = Item('key')
+
+        def turn(n): #Something changes in one container every turn
+            boxes[n % len(boxes)].items.append(key)
+            game.check_events()
+
+        results.append((label, timed(turn, range(turns))))
+
+    report("events ({} containers)".format(containers), turns, "turns", results)
+
+#Commands that play all the way through the test game
+TEST_GAME_COMMANDS = ['stexka paetbe', 'stoxka paetbe', 'stexka paetbe', 'stoxka paetbe', 'stixka paetbe',
+                      'motsnika loskilbe', 'merbe', 'stoxka paetbe', 'motsnika mogke skilbe', 'stixka paetbe']
+
+def bench_turns(games=2000):
+    """Plays through the test game headless, with the output going into a list or a StringIO."""
+    turns = games * len(TEST_GAME_COMMANDS)
+
+    def play(make_output):
+        game = GameEngine(TEST_GAME_COMMANDS, make_output())
+        game.game_loop(build_world(game))
+
+    report("headless test game ({} games)".format(games), turns, "turns", [
+        ('list', timed(lambda n: play(list), range(games))),
+        ('StringIO', timed(lambda n: play(io.StringIO), range(games))),
+    ])
+
+#Makes a new game in every way a session could, and the commands played in each
+def make_sessions(template, player):
+    def build():
+        game = GameEngine([], [])
+        return game, build_world(game)
+
+    def deep_copy():
+        game = GameEngine([], [])
+        game.maps, player_copy = copy.deepcopy((template.maps, player))
+        return game, player_copy
+
+    def spawn():
+        game = template.spawn(player, [], [])
+        return game, None
+
+    return [('build_world', build), ('deepcopy', deep_copy), ('spawn', spawn)]
+
+def bench_instance(sessions=2000, turns=5):
+    """Compares making a new world for a session by building, deep copying, or
+    an instance of a template, in time and memory per session."""
+    template = GameEngine([])
+    player = build_world(template)
+    results = []
+
+    for label, make in make_sessions(template, player):
+        took = timed(lambda n: make(), range(sessions))
+
+        tracemalloc.start()
+        games = [make() for _ in range(sessions)]
+        made, _ = tracemalloc.get_traced_memory()
+
+        for game, session_player in games: #Play a few turns in each
+            game.start(session_player)
+            for line in TEST_GAME_COMMANDS[:turns]:
+                game.step(line)
+
+        played, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results.append((label, took, made / sessions, played / sessions))
+
+    print("world instances ({} sessions, {} turns each)".format(sessions, turns))
+    for label, took, made, played in results:
+        print("  {:<20}{:>10.3f}s {:>10.0f} bytes/session made {:>10.0f} bytes/session after playing".format(
+            label, took, made, played))
+
+#Makes a game with a grid of rooms (about rooms of them), each with an item and a box
+def make_grid_game(rooms, seed=0):
+    rand = random.Random(seed)
+    width = max(1, int(rooms ** 0.5))
+    grid = []
+
+    for n in range(width * width):
+        room = Room('room {}'.format(n), "A room in a big grid.", "")
+        room.add_items(Item('item', "An item.", [str(n)], 'item'), Container('box', "A box.", [str(n)], 'box'))
+        grid.append(room)
+
+        if n % width > 0: #Connect to the room to the west
+            room.make_connect('w', grid[n - 1])
+
+        if n >= width: #And to the north
+            room.make_connect('n', grid[n - width])
+
+            if rand.random() < 0.1: #Lock some of the ways
+                room.north.setup_lock(Item('key'))
+
+    game = GameEngine([], [])
+    game.add_map(grid[0])
+    return game
+
+#Plays through a game by changing it as the player would (visiting, taking, unlocking..)
+def play_grid_game(game, turns, seed=0):
+    rand = random.Random(seed)
+    room = game.maps[0]
+    game.current_room = room
+
+    for _ in range(turns):
+        room.visited = True
+        exits = [x for x in room.exits if x != None]
+        exit = rand.choice(exits)
+
+        if rand.random() < 0.2 and len(room.items) > 0: #Take something, or put it in a box
+            item = room.items[0]
+            room.items.remove(item)
+            game.player.inventory.append(item)
+
+        elif rand.random() < 0.1 and len(game.player.inventory) > 0:
+            boxes = [x for x in room.items if type(x).__name__ == 'Container']
+            if len(boxes) > 0:
+                item = game.player.inventory[0]
+                game.player.inventory.remove(item)
+                boxes[0].items.append(item)
+
+        exit.locked = False
+        room = exit.room
+        game.moves += 1
+
+    game.current_room = room
+
+def bench_save(sizes=(100, 1000, 10000, 100000), turns=500, repeat=20):
+    """Save and restore of a spawned game on big maps, after turns of playing."""
+    print("save / restore ({} turns played)".format(turns))
+
+    for rooms in sizes:
+        template = make_grid_game(rooms)
+        start = time.perf_counter()
+        index = Save.WorldIndex(template.maps, Player())
+        indexed = time.perf_counter() - start
+
+        game = template.spawn(Player(), [], [])
+        play_grid_game(game, turns)
+
+        saved = timed(lambda n: Save.dumps(Save.save(game, index)), range(repeat)) / repeat
+        text = Save.dumps(Save.save(game, index))
+
+        def restore(n):
+            Save.restore(template.spawn(Player(), [], []), Save.loads(text), index)
+
+        restored = timed(restore, range(repeat)) / repeat
+
+        print("  {:>7} objects  index {:>8.1f}ms  save {:>7.2f}ms  restore {:>7.2f}ms  {:>8} bytes".format(
+            len(index.objects), indexed * 1000, saved * 1000, restored * 1000, len(text)))
+
+def bench_movement(rooms=10000, turns=200000, seed=0):
+    """Moves about a grid of rooms with the go command (looking up the exit by the
+    direction's number), without showing the rooms entered."""
+    game = make_grid_game(rooms, seed)
+    game.write_line = lambda line: None
+    game.current_room = game.maps[0]
+    rand = random.Random(seed)
+    commands = [[('go', 'command'), {'obj': ((rand.choice(DIRECTIONS.names), None), []),
+                 'quote': '<NIL>', 'indir obj': '<NIL>'}] for _ in range(turns)]
+
+    def go(command):
+        game.command = command
+        go_command(game)
+
+    report("movement ({} rooms)".format(rooms), turns, "moves", [('go', timed(go, commands))])
+
+def bench_maps(sizes=(100, 900, 10000, 100000), lookups=100000):
+    """Compiles grids of rooms, and looks up the way to go between random rooms."""
+    print("map compiler ({} lookups)".format(lookups))
+
+    for rooms in sizes:
+        graph = make_grid_game(rooms).maps[0]
+        start = time.perf_counter()
+        compiled = MapCompiler.CompiledMap(graph)
+        took = time.perf_counter() - start
+
+        rand = random.Random(0)
+        goals = [rand.choice(compiled.nodes) for _ in range(10)] #Few goals, so their paths are reused
+        pairs = [(rand.choice(compiled.nodes), rand.choice(goals)) for _ in range(lookups)]
+        looked = timed(lambda pair: compiled.next_direction(*pair), pairs)
+
+        print("  {:>7} rooms  compile {:>9.1f}ms  {:>10.0f} lookups/s  {} dead ends".format(
+            len(compiled.nodes), took * 1000, lookups / looked, len(compiled.dead_ends)))
+
+def bench_scale(sizes=(10, 100, 1000, 10000, 100000), turns=5000):
+    """Generates worlds of more and more rooms, and plays them headless with a player
+    wandering about, for the startup time, memory per room, and turns a second."""
+    print("generated worlds ({} turns each)".format(turns))
+
+    for rooms in sizes:
+        output = []
+        game = GameEngine([], output)
+        start = time.perf_counter()
+        player = Generator.generate_world(game, rooms)
+        game.start(player)
+        startup = time.perf_counter() - start
+
+        tracemalloc.start() #Generated again, for the memory it takes (kept until it's measured)
+        probe = GameEngine([], [])
+        kept = Generator.generate_world(probe, rooms)
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del probe, kept
+
+        lines = Generator.generate_commands(game, turns)
+        start = time.perf_counter()
+        for line in lines:
+            game.step(line)
+            output.clear()
+
+        took = time.perf_counter() - start
+
+        print("  {:>7} rooms  startup {:>9.1f}ms  {:>7.0f} bytes/room  {:>8.0f} turns/s".format(
+            rooms, startup * 1000, memory / rooms, len(lines) / took))
+
+def bench_lazy(chapters=8, rooms=2000, idle=1.0):
+    """Plays through a game of chapters maps, with the maps all built at the start, built
+    when they're gotten to, or built in the background while the player is idle (for idle
+    seconds in each map). Gives the startup time, the longest wait going to the next map,
+    and the most memory used."""
+    print("lazy maps ({} maps of {} rooms)".format(chapters, rooms))
+
+    for label, lazy, prefetch in [('all at the start', False, False), ('lazy', True, False),
+                                  ('lazy, prefetched', True, True)]:
+        gc.collect() #Don't count cleaning up after the last game
+        tracemalloc.start()
+        start = time.perf_counter()
+        game = GameEngine([], [])
+        game.prefetch_maps = prefetch
+        game.start(Generator.generate_world(game, rooms * chapters, maps=chapters, lazy=lazy))
+        startup = time.perf_counter() - start
+        longest = 0
+
+        while game.playing:
+            time.sleep(idle) #The player reading, and thinking of what to do
+            start = time.perf_counter()
+            game.load_next_map() #Same as going into the transistion
+            longest = max(longest, time.perf_counter() - start)
+
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print("  {:<20} startup {:>8.1f}ms  longest wait for a map {:>8.1f}ms  peak {:>6.1f}MB".format(
+            label, startup * 1000, longest * 1000, peak / 2 ** 20))
+
+#Makes the text of a world file with a grid of rooms, each with two books (one of them
+#the key to some of the locked ways) and some with a box holding an item, that says when it has a book
+def make_world_text(rooms, seed=0):
+    rand = random.Random(seed)
+    width = max(1, int(rooms ** 0.5))
+    lines = []
+
+    for n in range(rooms):
+        items = ['book{}_{}'.format(n, k) for k in range(2)] + (['box{}'.format(n)] if n % 3 == 0 else [])
+        lines.append('START ROOM room{0}:\n\tname: "room {0}", description: "Room number {0}.", items: [{1}]\nEND'.format(n, ', '.join(items)))
+
+        for item in items[:2]:
+            lines.append('START ITEM {}: name: "book", description: "A book.", "room name": "book" END'.format(item))
+
+        if n % 3 == 0:
+            lines.append('START CONTAINER box{0}: name: "machine", "room name": "machine", collectable: FALSE, items: [thing{0}] END'.format(n))
+            lines.append('START ITEM thing{}: name: "item" END'.format(n))
+            lines.append('WHEN box{0} HOLDS book{0}_0 SAY "It has the book now.";'.format(n))
+
+        if n % width > 0:
+            lines.append('CONNECT room{} west room{};'.format(n, n - 1))
+
+        if n >= width:
+            lines.append('CONNECT room{} north room{};'.format(n, n - width))
+
+            if rand.random() < 0.1:
+                lines.append('LOCK room{0} north WITH book{0}_1;'.format(n))
+
+    lines += ['CONNECT room{} east TRANSISTION;'.format(rooms - 1), 'MAP room0;', 'MAP END "The end.";']
+    return '\n'.join(lines)
+
+def bench_world(sizes=(100, 1000, 10000)):
+    """Loads worlds from world files, by parsing them, and from their compiled version."""
+    folder = tempfile.mkdtemp()
+    print("world files")
+
+    for rooms in sizes:
+        path = os.path.join(folder, 'world{}.world'.format(rooms))
+        with open(path, 'w') as f:
+            f.write(make_world_text(rooms))
+
+        start = time.perf_counter()
+        world = worldParser.read_world(path)
+        parsed = time.perf_counter() - start
+        worldParser.save_world(world, path + 'c')
+
+        start = time.perf_counter()
+        world = worldParser.load_world_data(path + 'c')
+        loaded = time.perf_counter() - start
+
+        start = time.perf_counter()
+        worldParser.build_world(world)
+        built = time.perf_counter() - start
+
+        print("  {:>6} rooms  parse {:>8.1f}ms  load compiled {:>6.1f}ms  build {:>7.1f}ms  {:>9} bytes ({:>9} as text)".format(
+            rooms, parsed * 1000, loaded * 1000, built * 1000, os.path.getsize(path + 'c'), os.path.getsize(path)))
+
+#Commands that walk back and forth in the first room of the test game, looking around
+WALK_COMMANDS = ['stexka paetbe', 'merbe', 'stixka paetbe', 'mogka merbe']
+
+def bench_journal(turns=2000):
+    """Compares the cost of keeping a game safe, by journal (with different batches) or
+    by saving all of it every turn."""
+    template = GameEngine([])
+    player = build_world(template)
+    index = Save.WorldIndex(template.maps, player)
+    commands = [WALK_COMMANDS[n % len(WALK_COMMANDS)] for n in range(turns)]
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, 'save')
+    results = []
+
+    def play(keep):
+        for name in os.listdir(folder): #Start every game over
+            os.remove(os.path.join(folder, name))
+
+        game = template.spawn(player, [], [])
+        keep = keep(game)
+        game.start()
+
+        for line in commands:
+            game.step(line)
+            if keep != None: keep()
+
+        if game.journal != None:
+            game.journal.close()
+
+    def journal(batch):
+        return lambda game: Journal.Journal(path, index, batch).attach(game)
+
+    def save_every_turn(game):
+        return lambda: Journal.write_synced(path, Save.dumps(Save.save(game, index)))
+
+    for label, keep in [('nothing', lambda game: None), ('journal (1)', journal(1)),
+                        ('journal (32)', journal(32)), ('save every turn', save_every_turn)]:
+        results.append((label, timed(lambda n: play(keep), [None], 1)))
+
+    play(journal(32)) #Then see how long it takes to get back
+    start = time.perf_counter()
+    replayed = Journal.recover(path, template.spawn(player, [], []), index)
+    recovered = time.perf_counter() - start
+
+    report("journal", turns, "turns", results)
+    print("  recovered from {} journal entries in {:.1f}ms".format(replayed, recovered * 1000))
+
+#All of the benchmarks that can be ran
+BENCHMARKS = {'classify': bench_classify, 'deconstruct': bench_deconstruct, 'vocab': bench_vocab,
+              'lexer': bench_lexer, 'ast': bench_ast, 'events': bench_events,
+              'turns': bench_turns, 'instance': bench_instance,
+              'save': bench_save, 'journal': bench_journal, 'movement': bench_movement,
+              'maps': bench_maps, 'scale': bench_scale, 'lazy': bench_lazy,
+              'world': bench_world}
+
+if __name__ == '__main__':
+    #Run the benchmarks asked for, or all of them
+    for name in sys.argv[1:] or list(BENCHMARKS):
+        if name not in BENCHMARKS:
+            print("Unknown benchmark '{}', pick from: {}".format(name, ", ".join(BENCHMARKS)))
+            raise SystemExit
+
+        BENCHMARKS[name]()
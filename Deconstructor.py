@@ -8,15 +8,18 @@ Author: Alastar Slater
 Date: 3/6/19
 """
 #Import parser and all of the import dictionaries
-from Parser import Parser, NOUNS, VERBS, ADJECTIVES, ADVERBS, CONJUNCS, vocab
+from Parser import Parser, NOUNS, VERBS, ADJECTIVES, ADVERBS, CONJUNCS, vocab, WORD_CLASSES
+from multiprocessing import Pool
+from collections import OrderedDict
+from functools import partial
 
 #The opposite definitions of verbs
 VERB_INVERSES = vocab['verb inverses']
 
 class Deconstructor:
-    def __init__(self, text=""):
-        #Get the full abstract syntax tree
-        self.parser = Parser(text)
+    def __init__(self, text="", lexer=None):
+        #Get the full abstract syntax tree (lexer is the Parser's default if not given)
+        self.parser = Parser(text, lexer)
         self.ast = self.parser.parse_all() #Try to parse sentence
         self.error = self.parser.error #get error state
 
@@ -126,3 +129,104 @@ class Deconstructor:
         #Return the list of statements to execute
         return [self.visit(x) for x in self.ast] 
 
+    @staticmethod
+    def deconstruct_many(lines, processes=None, chunksize=64, lexer=None):
+        """Deconstructs every line from an iterable of lines, giving back the list of
+        statements for each line in order (same as Deconstructor(line).deconstruct()).
+        The word classes and affix cache are shared by every line. If processes is
+        given, the lines are spread out over a pool of that many processes."""
+        if processes == None: #Do it all in this process
+            for line in lines:
+                yield deconstruct_line(line, lexer)
+
+        else: #Otherwise, hand out chunks of lines to the pool
+            with Pool(processes) as pool:
+                yield from pool.imap(partial(deconstruct_line, lexer=lexer), lines, chunksize)
+
+#Deconstructs a single line (module level so worker processes can use it)
+def deconstruct_line(line, lexer=None):
+    return Deconstructor(line, lexer).deconstruct()
+
+#Deconstructs a single line, giving back the statements and the error state
+def deconstruct_with_error(line, lexer=None):
+    decon = Deconstructor(line, lexer)
+    return decon.deconstruct(), decon.error
+
+#Makes a copy of a deconstructed command, so changing it won't change what is cached
+def copy_command(command):
+    if type(command) == tuple:
+        return tuple(copy_command(x) for x in command)
+
+    elif type(command) == list:
+        return [copy_command(x) for x in command]
+
+    elif type(command) == dict:
+        return {key: copy_command(value) for key, value in command.items()}
+
+    return command #Strings and None can be shared
+
+#Remembers the most recently deconstructed lines, since players repeat the same commands
+class CommandCache:
+    def __init__(self, size=256):
+        self.size = size #Most lines that are remembered (0 to remember nothing)
+        self.entries = OrderedDict() #Line -> (statements, error), oldest first
+        self.hits = 0 #Times a line was already deconstructed
+        self.misses = 0 #Times a line had to be deconstructed
+        self.version = WORD_CLASSES.version #Version of the word classes used
+
+    #Lines are the same if they only differ by case or whitespace
+    def key(self, line):
+        return ' '.join(line.lower().split())
+
+    def clear(self):
+        """Forgets every line, such as when the vocabulary changes."""
+        self.entries.clear()
+        self.version = WORD_CLASSES.version
+
+    def deconstruct(self, line, lexer=None):
+        """Returns the list of statements for this line and the error state, same as
+        deconstructing it. The statements are a copy, and are safe to change."""
+        found = self.lookup(line)
+
+        if found != None: #Already deconstructed
+            return found
+
+        #Otherwise, deconstruct it and remember it
+        statements, error = deconstruct_with_error(line, lexer)
+        self.remember(line, statements, error)
+
+        return copy_command(statements), error
+
+    def lookup(self, line):
+        """Gives back a copy of the statements and the error state if this line is
+        remembered, otherwise none (and counts it as a miss)."""
+        if self.version != WORD_CLASSES.version: #Word classes changed since
+            self.clear()
+
+        key = self.key(line)
+
+        if key not in self.entries:
+            self.misses += 1
+            return None
+
+        #Already deconstructed, move to the newest
+        self.hits += 1
+        self.entries.move_to_end(key)
+        statements, error = self.entries[key]
+
+        return copy_command(statements), error
+
+    def remember(self, line, statements, error):
+        """Remembers what this line deconstructed to (such as when it was
+        deconstructed somewhere else)."""
+        if self.size > 0:
+            self.entries[self.key(line)] = (statements, error)
+
+            #Forget the oldest line if there are too many
+            if len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def stats(self):
+        """Gives back the hits, misses, and how many lines are remembered."""
+        return {'hits': self.hits, 'misses': self.misses,
+                'entries': len(self.entries), 'size': self.size}
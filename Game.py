@@ -1,15 +1,30 @@
 """
 """
 #Import Deconstructor so it can be used for the game
-from Deconstructor import Deconstructor
-from Tools import Room, Item, Container, Actor, Player #So I can make tests
+from Deconstructor import Deconstructor, CommandCache
+from Parser import RegexLexer, vocab
+from Tools import Room, Item, Container, Actor, Player, DIRECTIONS #So I can make tests
+from World import WorldInstance
+from worldParser import load_world_map
+from concurrent.futures import ThreadPoolExecutor
 from functools import reduce
 from textwrap import wrap
-import colorama #so I can use unicode characters
+import runpy
+import time
 import sys
+import os
 
-#All of the cardinal directions used in the engine
-CARDINALS = ['north', 'south', 'east', 'west']
+try: #colorama is only needed when playing in a terminal
+    import colorama #so I can use unicode characters
+except ImportError:
+    colorama = None
+
+#Directions added in the vocabulary (each with the direction going back)
+for direct, opposite in vocab.get('directions', {}).items():
+    DIRECTIONS.register(direct, opposite)
+
+#All of the directions used in the engine
+CARDINALS = DIRECTIONS.names
 
 
 def nil_command(self): #When no verb is given
@@ -26,61 +41,22 @@ def go_command(self):
     meat = self.command[1] #Main 'meat' (most of) the verb 
 
     if meat['obj'] != '<NIL>': #If there is some direction (hopefully)
+        number = DIRECTIONS.number(meat['obj'][0][0]) #Number of the direction
+        exit = None if number == None else self.current_room.get_exit(number)
+
         #Tell user we can't move in that direction
-        if meat['obj'][0][0] not in CARDINALS:
-            #Tell the user we can't move
+        if exit == None:
             self.raise_error(self.NOT_MOVE_IN_DIR)
             self.error = False
 
-        #If we can go north, do so
-        elif meat['obj'][0][0] == 'north' and self.current_room.north != None:
-            #If the way isn't locked
-            if self.current_room.north.locked == False:
-                self.current_room.player_here = False #Say player isn't here
-                #Go north into the new room
-                self.current_room = self.current_room.north.room
-                self.enter_room() #Show dialog
-
-            #Otherwise, the way is locked
-            else:
-                self.output_text(self.WAY_LOCKED)
-
-        #Move south if possible
-        elif meat['obj'][0][0] == 'south' and self.current_room.south != None:
-            #If the way isn't locked
-            if self.current_room.south.locked == False: 
-                self.current_room.player_here = False #Say player isn't here
-                self.current_room = self.current_room.south.room
-                self.enter_room() #Show dialog
-
-            else: #Otherwise, if locked, raise error
-                self.output_text(self.WAY_LOCKED)
-
-        #Move east if possible
-        elif meat['obj'][0][0] == 'east' and self.current_room.east != None:
-            #If the exit is not locked, continue
-            if self.current_room.east.locked == False:
-                self.current_room.player_here = False #Say player isn't here
-                self.current_room = self.current_room.east.room
-                self.enter_room() #Show dialog
-
-            else: #Otherwise, if locked, raise error
-                self.output_text(self.WAY_LOCKED)
-
-        #Move west if possible
-        elif meat['obj'][0][0] == 'west' and self.current_room.west != None:
-            #If the entrance isn't locked, proceed to the next room
-            if self.current_room.west.locked == False:
-                self.current_room.player_here = False #Say player isn't here
-                self.current_room = self.current_room.west.room
-                self.enter_room() #Show dialog
-
-            else: #Otherwise, the way is locked
-                self.output_text(self.WAY_LOCKED)
-
-        else: #cannot move
-            self.raise_error(self.NOT_MOVE_IN_DIR)
-            self.error = False
+        #If the way isn't locked, go into the next room
+        elif exit.locked == False:
+            self.current_room.player_here = False #Say player isn't here
+            self.current_room = exit.room
+            self.enter_room() #Show dialog
+
+        else: #Otherwise, the way is locked
+            self.output_text(self.WAY_LOCKED)
 
     else: #Cannot move at all
         self.raise_error(self.CANNOT_MOVE)
@@ -127,6 +103,10 @@ def see_command(self):
 
 #With a list of items, an item name and list of attributes, returns a list of corresponding items
 def get_items(items_list, name, attributes):
+    #Look it up in the index if this is an ItemList
+    if type(items_list).__name__ == 'ItemList':
+        return items_list.find(name, attributes)
+
     #Get all items with a matching name
     items = [item for item in items_list if item.name == name]
 
@@ -157,7 +137,7 @@ def take_command(self):
         if len(items) == 1 and items[0].collectable == True: 
             self.player.inventory.append(items[0])
             #Remove this item from the list of items
-            self.current_room.items = [item for item in self.current_room.items if item != items[0]]
+            self.current_room.items.remove(items[0])
             self.output_text("Taken.") #Tell the user the item has been taken
 
         #if the user cannot take this item at all
@@ -191,7 +171,7 @@ def take_command(self):
         #Add the item to the user's inventory
         self.player.inventory.append(items[0])
         #Remove the item put in the user's inventory
-        sources[0].items = [item for item in sources[0].items if item != items[0]]
+        sources[0].items.remove(items[0])
         sources[0].update_state() #Check if the item is empty now
         self.output_text("Taken.") #Text displayed when user gets the item
 
@@ -215,8 +195,8 @@ def give_command(self):
         #Add the item that the user is giving to the rooms list of items
         self.current_room.items.append(items[0])
         #Remove the item from the user's inventory
-        self.player.inventory = [i for i in self.player.inventory if i != items[0]]
-        print("Dropped.") #Tell the user that they dropped the item
+        self.player.inventory.remove(items[0])
+        self.output_text("Dropped.") #Tell the user that they dropped the item
 
     #If we have something to give the item to
     elif phrase['obj'] != '<NIL>' and phrase['indir obj'] != '<NIL>':
@@ -253,8 +233,8 @@ def give_command(self):
         if type(targets[0]).__name__ == 'Container': targets[0].update_state()
 
         #Remove this item from the player's inventory
-        self.player.inventory = [i for i in self.player.inventory if i != items[0]]
-        print("Given.") #Tell the user that it has been given
+        self.player.inventory.remove(items[0])
+        self.output_text("Given.") #Tell the user that it has been given
 
     else: #Otherwise, tell user there is a problem
         self.output_text(self.GRAMMAR_ERROR)
@@ -262,13 +242,8 @@ def give_command(self):
 #Effect an exit in some form or another
 def cause_exit(self):
     phrase = self.command[1]
-    direct = phrase['obj'][0][0] #Get the direction
-
     #Get the exit we'll effect
-    if direct == 'north': direct = self.current_room.north
-    elif direct == 'south': direct = self.current_room.south
-    elif direct == 'east': direct = self.current_room.east
-    elif direct == 'west': direct = self.current_room.west
+    direct = self.current_room.get_exit(DIRECTIONS.number(phrase['obj'][0][0]))
 
     if direct == None: #If this is not a direction we can effect
         self.output_text(self.NOT_EXIT)
@@ -298,7 +273,7 @@ def cause_command(self):
     if phrase['obj'] == '<NIL>': #Raise an error
         self.output_text(self.INTERACT_NO_OBJ)
 
-    elif phrase['obj'][0][0] in CARDINALS: #Need to effect an exit
+    elif DIRECTIONS.number(phrase['obj'][0][0]) != None: #Need to effect an exit
         cause_exit(self) #Do all that is needed to interact with exits
 
     elif phrase['indir obj'] == '<NIL>': #Not using any object
@@ -336,26 +311,113 @@ def cause_command(self):
         #Try to use the user's item on this object
         room_items[0].use(inven_items[0], self)
 
+#Gives back every object joined together by 'and' (the Deconstructor nests them to the
+#right, A al B al C is ('and', [A, ('and', [B, C])])), in the order they were said
+def conjoined_objects(obj):
+    stack = [obj] #Objects left to look at, next one on top
+
+    while len(stack) > 0:
+        obj = stack.pop()
+
+        if type(obj) == tuple and obj[0] == 'and': #Look at each joined object
+            stack.extend(reversed(obj[1]))
+
+        else:
+            yield obj
+
+#Expands every command that has more than one object into a command for each object
+def expand_commands(full_command):
+    for verb, phrase in full_command:
+        if phrase['obj'][0] == 'and':
+            #Same command, only the object changes
+            for obj in conjoined_objects(phrase['obj']):
+                yield (verb, {'obj': obj, 'quote': phrase['quote'], 'indir obj': phrase['indir obj']})
+
+        else:
+            yield (verb, phrase)
+
 def quit_command(self): #Quits the game without saving
     self.playing = False #Stops the game
 
+#Gives back a function that writes a line of text out to the output given, which can
+#be a list (lines are added to it), or anything with a write method (a file, StringIO..)
+def make_writer(output):
+    if output == None: #Print to the terminal
+        return print
+
+    elif type(output).__name__ == 'list':
+        return output.append
+
+    return lambda line: output.write(line + '\n')
+
+#Builds the map in a python file, which has a build_map function (taking the game, and
+#giving back the map)
+def load_python_map(path, game):
+    return runpy.run_path(path)['build_map'](game)
+
+#How maps in files are built, by the extension of the file. Each loader takes the path
+#and the game, and gives back the map (it's first room)
+MAP_LOADERS = {'.py': load_python_map, '.world': load_world_map, '.worldc': load_world_map}
+
+#A map that isn't built until the game gets to it, from a function (taking the game,
+#and giving back the map) or a file (built by the loader for it's extension)
+class LazyMap:
+    def __init__(self, source):
+        self.source = source
+
+    def build(self, game):
+        if callable(self.source):
+            return self.source(game)
+
+        return MAP_LOADERS[os.path.splitext(self.source)[1]](self.source, game)
+
 #Superclass for gaming a game
 class GameEngine(object):
-    def __init__(self):
-        colorama.init() #Startup colorama
+    def __init__(self, commands=None, output=None):
+        """Plays in the terminal, unless commands are given (any iterable of lines, such as
+        a list or an open file), then it runs headless: the commands are played one
+        after another, and the output is written to output (a list, a file or
+        anything with write, or printed if not given)."""
+        self.headless = commands != None #If we are playing without a terminal
+        self.commands = iter(commands) if self.headless else None
+        self.write_line = make_writer(output) #Writes out a line of the output
+
+        if self.headless == False and colorama != None:
+            colorama.init() #Startup colorama
 
         #List of room graphs, in the order they should be ran.
         #(First room graph is loaded first..)
         self.maps = []
         self.map_index = 0 #The map we will load / are using
+        self.release_maps = True #If maps are let go of once they're left behind
+        #If the next map is built in the background, if it's lazy. It's built while the game is
+        #being played, so the functions making the maps must not change (or use) the game
+        self.prefetch_maps = False
+        self.prefetcher = None #Thread the next maps are built on, made the first time it's needed
+        self.prefetched = {} #Index of a map being built in the background -> it's future
+        self.compiled_maps = {} #uid of the first room of a map -> the map compiled (see MapCompiler.py)
         self.current_room = None #Current room we are in
         self.playing = True #if we are playing the game
         self.player = None #player object
+        self.world = None #Instance of the world, if the maps are a template (see spawn)
+        self.journal = None #Journal the commands are written to, if any (see Journal.py)
+        self.executed = [] #Commands run on this turn, for the journal
         self.score = 0 #How well the user is doing
         self.moves = 0 #How many actions the user has done
+        self.lexer = RegexLexer #Lexer used on the user's input (RegexLexer or Lexer)
+        #Remembers recently deconstructed input (give a size of 0 to turn off)
+        self.command_cache = CommandCache(256)
+        #What checking the events has cost, over all turns and on the last turn
+        self.event_turns = 0
+        self.event_checks = 0 #Conditions checked
+        self.event_time = 0.0 #Seconds
+        self.last_event_checks = 0
+        self.last_event_time = 0.0
 
         #=[PROMPTS]=
         self.PROMPT = ">" #Prompt for getting user import
+        #Put at the end of every line to reset the colour (not needed when headless)
+        self.RESET = "" if self.headless else "\x1b[0m"
         self.ROOM_NAME = "\t\t\t   -=[{}]=-" #Way the room name is printed
         self.START_TEXT = "" #Text put in the very beginning as intro
 
@@ -407,7 +469,7 @@ class GameEngine(object):
     def output_text(self, text):
         """Wraps the text to ~80 chars per row, then prints."""
         for line in wrap(text):
-            print(line + '\x1b[0m')
+            self.write_line(line + self.RESET)
 
     #Startup total play of next map
     def load_next_map(self):
@@ -417,16 +479,21 @@ class GameEngine(object):
 
     #Loads the current map
     def load_map(self):
-        self.current_room = self.maps[self.map_index]
+        self.current_room = self.get_map(self.map_index)
 
         #Print out exit text, and stop the engine
         if type(self.current_room).__name__ == 'End':
             self.output_text(self.current_room.end_text)
             self.playing = False
+            self.stop_prefetching() #No more maps to get to
 
     #Sets up map index to load next map
     def select_next_map(self):
         if self.map_index < len(self.maps):
+            if self.release_maps: #We never go back, so let go of the map we're leaving
+                self.compiled_maps.pop(getattr(self.maps[self.map_index], 'uid', None), None)
+                self.maps[self.map_index] = None
+
             self.map_index += 1
 
     def enter_room(self):
@@ -450,12 +517,14 @@ class GameEngine(object):
                 if self.current_room.room_start_text.strip() != "" and self.current_room.start_text_shown == False:
                     self.current_room.start_text_shown = True #We've now shown this text
                     self.output_text(self.current_room.room_start_text) #Print out the text
-                    print()
+                    self.write_line('')
 
                 self.output_text(self.current_room.get_description()) #Give description
 
     def delete_last_line(self):
         """Deletes last outputted line of text."""
+        if self.headless: return #Nothing to take back
+
         sys.stdout.write("\x1b[1A") #Move cursor up one
         sys.stdout.write("\x1b[1K") #Erase the line
 
@@ -468,25 +537,11 @@ class GameEngine(object):
     def consume_input(self):
         """Use up all the input and execute each of them in sequence (or try to)."""
 
-        i = 0 #Command index
-        for command in self.full_command:
-
-            #If the object uses a conjunction, extend it into multiple commands
-            #(since it'll do the same thing, and make it easier for programming actions)
-            if command[1]['obj'][0] == "and":
-                #Template rest of the sentence
-                template = {'obj':'CHANGE', 'indir obj':command[1]['indir obj'], 'quote':command[1]['quote']}
-                n = i + 1
-                for obj in command[1]['obj'][1][1:]:
-                    #Setup the template for this sub type
-                    new_tem = eval(str(template))
-                    new_tem['obj'] = obj
-                    #Add in the sub-command
-                    self.full_command.insert(n, (command[0], new_tem)) 
-                    n += 1
-
-                command[1]['obj'] = command[1]['obj'][1][0] 
+        executed = [] #Commands that were run, for the journal
 
+        #Commands with more than one object are expanded into a command for each
+        #(since it'll do the same thing, and make it easier for programming actions)
+        for command in expand_commands(self.full_command):
             #Load up the current command to be run
             self.command = command
 
@@ -501,69 +556,224 @@ class GameEngine(object):
             else: #Otherwise, this verb is defined
                 self.execute[verb](self)
                 self.moves += 1 #Note taht we've done an action
-                i += 1 #Note we're going to next command
+                executed.append(command)
+
+        self.executed = executed
 
         #Make sure input buffers are cleared out
         self.full_command = []
         self.command = []
 
+    def read_line(self):
+        """Gives back the next line of input, from the user or the commands when headless
+        (none when the commands have run out)."""
+        if self.headless == False:
+            return input(self.PROMPT)
+
+        line = next(self.commands, None)
+
+        if line == None: #Out of commands, stop here
+            self.playing = False
+            return None
+
+        line = line.rstrip('\n')
+        self.write_line(self.PROMPT + line) #Keep the input with the output
+        return line
+
     def prompt(self):
         """Gets input from the user and then consumes input."""
         #Get input from the user on what they want to do next
-        print() #Extra spacing in input
-        line = input(self.PROMPT)
+        self.write_line('') #Extra spacing in input
+        line = self.read_line()
 
         #Continue getting input until something is given
-        while line.strip() == "":
+        while line != None and line.strip() == "":
             self.delete_last_line()
-            line = input(self.PROMPT)
+            line = self.read_line()
+
+        if line == None: #No more input
+            return []
 
-        #The deconstructor-- will give us usable versions of sentences
-        decon = Deconstructor(line)
-        #Attempt to deconstruct the user's input
-        full_command = decon.deconstruct()
+        return self.read_command(line)
 
-        if decon.error == True: #If an error occured, don't save input, tell user
+    def read_command(self, line):
+        """Deconstructs a line of input into the full command (telling the user if
+        there was an error with it)."""
+        #Attempt to deconstruct the user's input (or get it from the cache)
+        return self.accept_command(*self.command_cache.deconstruct(line, self.lexer))
+
+    def accept_command(self, full_command, error):
+        """Gives back the deconstructed command, unless there was an error with it."""
+        if error == True: #If an error occured, don't save input, tell user
             self.output_text(self.GRAMMAR_ERROR) #Print out that an error occured
             return [] #Return full command
 
         return full_command #What the total command is
 
+    def check_events(self):
+        """Checks the events of the current room (and it's items), and notes what it cost."""
+        start = time.perf_counter()
+        checks = self.current_room.check_events(self)
+        took = time.perf_counter() - start
+
+        self.event_turns += 1
+        self.event_checks += checks
+        self.event_time += took
+        self.last_event_checks, self.last_event_time = checks, took
+
+    def event_stats(self):
+        """Gives back how many conditions were checked, and how long it took,
+        on the last turn and on average over every turn."""
+        turns = max(self.event_turns, 1)
+        return {'turns': self.event_turns, 'checks': self.event_checks, 'seconds': self.event_time,
+                'checks per turn': self.event_checks / turns, 'seconds per turn': self.event_time / turns,
+                'last checks': self.last_event_checks, 'last seconds': self.last_event_time}
+
+    def command_cache_stats(self):
+        """Gives back the hits and misses of the cache of deconstructed input."""
+        return self.command_cache.stats()
+
     #Add this map to the list of maps to be loaded
     def add_map(self, graph):
-        """Adds a gamemap to the list of maps to load in order."""
+        """Adds a gamemap to the list of maps to load in order. The map can also be
+        a function (taking the game and giving back the map) or the path of a map file
+        (see MAP_LOADERS), which is only built once the game gets to it. When prefetching
+        maps, it's built in the background while the game is played, and must not touch the game."""
+        if callable(graph):
+            graph = LazyMap(graph)
+
+        elif type(graph).__name__ == 'str':
+            if os.path.splitext(graph)[1] not in MAP_LOADERS:
+                print(f"RUNTIME ERROR: NO WAY TO LOAD THE MAP '{graph}', MAPS CAN BE: {', '.join(MAP_LOADERS)}")
+                raise SystemExit
+
+            graph = LazyMap(graph)
+
         self.maps.append(graph)
 
+    def get_map(self, index):
+        """Gives back the map at this index, building it first if it's lazy (and starting
+        to build the one after it, if prefetching maps)."""
+        graph = self.maps[index]
+
+        if type(graph).__name__ == 'LazyMap':
+            future = self.prefetched.pop(index, None)
+            graph = self.maps[index] = graph.build(self) if future == None else future.result()
+
+        if self.prefetch_maps and index + 1 < len(self.maps):
+            following = self.maps[index + 1]
+
+            if type(following).__name__ == 'LazyMap' and index + 1 not in self.prefetched:
+                if self.prefetcher == None:
+                    self.prefetcher = ThreadPoolExecutor(1)
+
+                self.prefetched[index + 1] = self.prefetcher.submit(following.build, self)
+
+        return graph
+
+    def stop_prefetching(self):
+        """Stops the thread the next maps are built on (a map being built is finished)."""
+        if self.prefetcher != None:
+            self.prefetcher.shutdown(wait=False, cancel_futures=True)
+            self.prefetcher = None
+            self.prefetched.clear()
+
     def add_command(self, verb, function):
         """Adds a command for the gameplay, a verb which is the command,
         and a function (which takes only self) to then have access to self.command
         to perform the action needed."""
         self.execute[verb] = function
 
-    def game_loop(self, player=Player()):
-        """Main game loop. Keep running until 'end condition' (i.e. self.playing == False).
-        Player must be fed into this function for game to properly start (otherwise, an 'empty'
-        player is used, no attributes, name or description."""
+    def spawn(self, player=None, commands=None, output=None):
+        """Makes a new game that plays this game's maps as a template, with it's own
+        copy-on-write instance of the world (see World.py), so the maps here are never
+        changed. Player is the template for the new game's player. Commands and output
+        are the same as for a new GameEngine."""
+        game = GameEngine(commands, output)
+
+        #Use the same texts (everything in upper case) and commands as this game
+        for attr, value in vars(self).items():
+            if attr.isupper() and attr != 'RESET': #Reset is up to if it's headless
+                setattr(game, attr, value)
+
+        game.execute = dict(self.execute)
+        game.lexer = self.lexer
+
+        instance = WorldInstance(self.maps)
+        game.maps = instance.maps
+        game.world = instance
 
-        self.player = player #Save player object for gameplay
+        if player != None:
+            game.player = instance.player(player)
+
+        return game
+
+    def start(self, player=None):
+        """Starts the game up, and enters the first room (or the room we are in, if carrying
+        on from a restored save). Player must be fed into this function for game to properly
+        start (otherwise, an 'empty' player is used, no attributes, name or description."""
+        if player != None: #Save player object for gameplay
+            self.player = player
+
+        elif self.player == None: #A new one each game
+            self.player = Player()
 
         if len(self.maps) == 0: #Raise error, can't start
             print("RUNTIME ERROR: NO MAPS IN GAME, GAME COULDN'T LOAD ANYTHING AND START")
             raise SystemExit
 
-        #print out whatever introduction there is
-        self.output_text(self.START_TEXT)
-        #Add padding to text if the start isn't NOTHING
-        if self.START_TEXT.strip() != "":
-            print() #Adds new line to intro
+        if self.current_room == None: #A new game
+            #print out whatever introduction there is
+            self.output_text(self.START_TEXT)
+            #Add padding to text if the start isn't NOTHING
+            if self.START_TEXT.strip() != "":
+                self.write_line('') #Adds new line to intro
 
-        #Load the first map (first room, really)
-        self.current_room = self.maps[self.map_index]
+            #Load the first map (first room, really)
+            self.current_room = self.get_map(self.map_index)
 
         self.enter_room() #Give room name and description
 
+        if self.playing: #Check events for this room, before the first turn
+            self.check_events()
+
+    def step(self, line):
+        """Plays one turn with this line of input, gives back if we are still playing."""
+        if line.strip() != "": #Nothing happens on an empty line
+            self.play_turn(*self.command_cache.deconstruct(line, self.lexer))
+
+        return self.playing
+
+    def play_turn(self, full_command, error=False):
+        """Plays one turn with a command that has already been deconstructed (such as
+        somewhere else), gives back if we are still playing."""
+        self.full_command = self.accept_command(full_command, error)
+        self.consume_input() #Use up whatever input is given
+        self.end_turn()
+
+        return self.playing
+
+    def end_turn(self):
+        """Checks the events after a turn, then writes the whole turn down (if there's a journal)."""
+        if self.playing: #Check events for this room
+            self.check_events()
+
+        if self.journal != None:
+            self.journal.record(self, self.executed)
+
+        self.executed = []
+
+        if self.playing == False: #Game over, the next maps are never needed
+            self.stop_prefetching()
+
+    def game_loop(self, player=None):
+        """Main game loop. Keep running until 'end condition' (i.e. self.playing == False).
+        Player must be fed into this function for game to properly start (otherwise, an 'empty'
+        player is used, no attributes, name or description."""
+        self.start(player)
+
         #keep going while we are 'playing'
         while self.playing:
-            self.current_room.check_events(self) #Check events for this room
             self.full_command = self.prompt() #Get input
             self.consume_input() #Use up whatever input is given
+            self.end_turn()
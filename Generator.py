@@ -0,0 +1,195 @@
+"""
+Makes worlds of any size out of the pieces in Tools.py, so the engine
+can be tried out on more than the test game. Rooms are laid out in a
+grid (so every room can be reached), with items, containers (some
+inside of other containers), actors, locked exits (with their key in
+the room before them) and events, picked at random from a seed.
+Also makes the commands (in Mouthful) for a player wandering about a
+generated world, to play it headless with.
+Play a generated world with 'python Generator.py [rooms]'.
+Date: 10/18/26
+"""
+from Tools import Room, Item, Container, Actor, Player, Transistion, End, DIRECTIONS
+from Parser import NOUNS
+import MapCompiler
+import random
+
+#Every noun in English -> the word for it in Mouthful
+MOUTHFUL = {english: word for word, english in NOUNS.items()}
+
+KEY_NAME = 'item' #Keys are all called this, so they're never mixed up with the other items
+CONTAINER_NAME = 'machine'
+ACTOR_NAME = 'person'
+ITEM_NAMES = ['book', 'window', 'computer'] #The other items (no more than one of each in a room)
+
+#Makes an item with one of the item names, some can't be taken
+def make_item(name, rand):
+    item = Item(name, "A {} made for this room.".format(name), [], name)
+    item.collectable = rand.random() < 0.8
+    return item
+
+#Makes a container, holding items (and maybe a container, up to depth deep)
+def make_container(rand, depth=2):
+    items = [make_item(rand.choice(ITEM_NAMES), rand) for _ in range(rand.randint(0, 2))]
+
+    if depth > 1 and rand.random() < 0.3: #A container inside of it
+        items.append(make_container(rand, depth - 1))
+
+    container = Container(CONTAINER_NAME, "A machine with room inside of it for things.", [], CONTAINER_NAME, items)
+    container.collectable = False
+
+    #Gets a new attribute once it's full of things
+    def fill_up(self, engine):
+        if 'full' not in self.attributes:
+            self.attributes = self.attributes + ['full']
+            engine.output_text("The machine is full now.")
+
+    container.make_event(lambda self: len(self.items) > 2, fill_up, ['items'])
+    return container
+
+#Makes a room with the things in it (each chosen by chance)
+def make_room(number, items, rand, container_chance, actor_chance, event_chance):
+    room = Room('room {}'.format(number), "Room number {} of the world.".format(number))
+    room.add_items(*[make_item(name, rand) for name in rand.sample(ITEM_NAMES, min(items, len(ITEM_NAMES)))])
+
+    if rand.random() < container_chance:
+        room.add_items(make_container(rand))
+
+    if rand.random() < actor_chance:
+        room.add_items(Actor(ACTOR_NAME, "Someone standing about.", [], ACTOR_NAME, [make_item('book', rand)]))
+
+    if rand.random() < event_chance: #The room changes once it's been seen
+        description = room.description
+
+        def seen(self):
+            self.description = description + " You've been here before."
+
+        room.make_event(lambda self: self.visited, seen, ['visited'])
+
+    return room
+
+def generate_map(rooms=100, items=2, seed=0, lock_chance=0.1, container_chance=0.3,
+                 actor_chance=0.05, event_chance=0.1):
+    """Makes a map of rooms rooms, with up to items items in each room (not counting
+    containers and actors), the way to the next map is in the last room. Gives back
+    the first room."""
+    rand = random.Random(seed)
+    width = max(1, int(rooms ** 0.5))
+    grid = []
+
+    for n in range(max(1, rooms)):
+        room = make_room(n, items, rand, container_chance, actor_chance, event_chance)
+        grid.append(room)
+
+        #Connect to the room to the west, the room to the north, or both (always one of them)
+        west = n % width > 0 and (n < width or rand.random() < 0.7)
+        north = n >= width and (west == False or rand.random() < 0.5)
+
+        if west:
+            room.make_connect('w', grid[n - 1])
+
+        if north:
+            room.make_connect('n', grid[n - width])
+
+            if rand.random() < lock_chance: #Locked, with the key here
+                key = Item(KEY_NAME, "A key.", [], KEY_NAME)
+                room.north.setup_lock(key)
+                room.add_items(key)
+
+    grid[-1].make_connect('e', Transistion())
+    return grid[0]
+
+def generate_world(game, rooms=100, items=2, seed=0, maps=1, lazy=False, **chances):
+    """Makes maps of about rooms rooms in all (split between the maps), adds them to
+    the game with the end after them, and gives back the player. Lazy maps are only
+    made once the game gets to them. Items and chances are the same as for generate_map."""
+    for number in range(maps):
+        if lazy:
+            game.add_map(lambda game, number=number: generate_map(rooms // maps, items, seed + number, **chances))
+
+        else:
+            game.add_map(generate_map(rooms // maps, items, seed + number, **chances))
+
+    game.add_map(End("You've seen all of the world there is to see."))
+    return Player('Unknown', "Just someone walking about.", [])
+
+#Things the wandering player does in a room, and how often (out of the number of times it's in a room)
+ROOM_ACTIONS = [('look', 0.2), ('see', 0.3), ('take', 0.2), ('put', 0.1), ('give', 0.1)]
+
+def generate_commands(game, turns, seed=0):
+    """Makes the lines a player would type wandering about the first map of a generated
+    game: walking to rooms picked at random (unlocking the way when it has to), and
+    looking at, taking and putting down things along the way. Gives back about turns lines."""
+    rand = random.Random(seed)
+    room = game.get_map(0)
+    compiled = MapCompiler.compile_map(game, room)
+    rooms = [node for node in compiled.nodes if type(node).__name__ == 'Room']
+    #What is in each room, as the player leaves it (uid -> names of items)
+    found = {}
+    unlocked = set() #Exits that have been unlocked already
+    lines = []
+
+    def names_in(room):
+        if room.uid not in found:
+            found[room.uid] = [item.name for item in room.items if getattr(item, 'collectable', False)]
+
+        return found[room.uid]
+
+    while len(lines) < turns:
+        goal = rand.choice(rooms)
+
+        while room != goal and len(lines) < turns:
+            direct = compiled.next_direction(room, goal)
+            exit = room.get_exit(DIRECTIONS.number(direct))
+
+            if exit.locked and exit.uid not in unlocked: #Take the key, unlock it, and leave it there
+                key = MOUTHFUL[KEY_NAME]
+                lines += [key + 'ka loskilbe', MOUTHFUL[direct] + 'ka ' + key + 'ke xambe', key + 'ka skilbe']
+                unlocked.add(exit.uid)
+
+            lines.append(MOUTHFUL[direct] + 'ka paetbe')
+            room = exit.room
+
+            for action, chance in ROOM_ACTIONS:
+                if rand.random() < chance:
+                    lines += room_action(action, room, names_in(room), rand)
+
+    return lines[:turns]
+
+#Gives back the lines for doing this in the room (the names of the items that can be taken there)
+def room_action(action, room, names, rand):
+    if action == 'look':
+        return ['merbe']
+
+    name = rand.choice([item.name for item in room.items] or [KEY_NAME])
+
+    if action == 'see':
+        return [MOUTHFUL[name] + 'ka merbe']
+
+    items = [x for x in names if x in ITEM_NAMES]
+    if len(items) == 0: #Nothing to take
+        return []
+
+    name = rand.choice(items)
+    word = MOUTHFUL[name]
+
+    if action == 'take': #Pick it up and put it back down
+        return [word + 'ka loskilbe', word + 'ka skilbe']
+
+    elif action == 'put' and CONTAINER_NAME in [item.name for item in room.items]:
+        names.remove(name) #It's in the container now
+        return [word + 'ka loskilbe', word + 'ka ' + MOUTHFUL[CONTAINER_NAME] + 'ke skilbe']
+
+    elif action == 'give' and ACTOR_NAME in [item.name for item in room.items]:
+        names.remove(name) #The actor has it now
+        return [word + 'ka loskilbe', word + 'ka ' + MOUTHFUL[ACTOR_NAME] + 'ke skilbe']
+
+    return []
+
+if __name__ == '__main__':
+    from Game import GameEngine
+    import sys
+
+    #Play a generated world in the terminal, of as many rooms as given
+    game = GameEngine()
+    game.game_loop(generate_world(game, int(sys.argv[1]) if len(sys.argv) > 1 else 100))
@@ -0,0 +1,165 @@
+"""
+A write-ahead journal of the commands played in a game (every one but
+looking about, including commands games add themselves), so a long
+game can be kept safe without saving the whole world every turn. Every
+turn is added to the journal as one line (a turn of only looking about
+is just it's moves), the lines are written out
+and synced in batches, and every so often a checkpoint (a save, see
+Save.py) is made and the journal is started over.
+Recovering restores the checkpoint, then plays the turns in the journal
+after it again, checking the events after every one of them the same as
+the game did.
+Date: 10/18/26
+"""
+import Save
+import json
+import os
+
+#Verbs of the commands that never change the world, and so aren't written to the journal
+READ_ONLY_VERBS = ['<NIL>', 'see']
+
+class Journal:
+    def __init__(self, path, index, batch=32, checkpoint_every=1000, read_only=READ_ONLY_VERBS):
+        """Path is where the checkpoint goes (the journal is next to it, ending in .log),
+        index is of the world being played (see Save.WorldIndex). Turns are synced every
+        batch turns, and a checkpoint is made every checkpoint_every turns. Commands with
+        read only verbs aren't written down (every other verb is, even ones added later)."""
+        self.path = path
+        self.log_path = path + '.log'
+        self.index = index
+        self.batch = batch
+        self.checkpoint_every = checkpoint_every
+        self.read_only = read_only
+        self.game = None #Game being written down
+        self.file = None #Open journal
+        self.buffer = [] #Turns not written out yet
+        self.sequence = 0 #Number of the last turn written down
+        self.since_checkpoint = 0 #Turns since the last checkpoint
+
+    def attach(self, game, sequence=0):
+        """Starts writing down the turns of this game (carrying on from sequence,
+        after the game has been recovered)."""
+        self.game = game
+        self.sequence = sequence
+        self.file = open(self.log_path, 'a')
+        game.journal = self
+
+    def record(self, game, commands):
+        """Writes down a turn, with the commands of it that can change the world (called by the
+        game at the end of every turn, after it's events, so a checkpoint has all of it)."""
+        self.add([command for command in commands if command[0][0] not in self.read_only])
+        self.since_checkpoint += 1
+
+        if self.since_checkpoint >= self.checkpoint_every:
+            self.checkpoint()
+
+        elif len(self.buffer) >= self.batch:
+            self.flush()
+
+    #Adds a turn to the buffer
+    def add(self, commands):
+        self.sequence += 1
+        self.buffer.append(json.dumps([self.sequence, self.game.moves, commands], separators=(',', ':')))
+
+    def flush(self):
+        """Writes out every turn not written yet, and syncs it to the disk."""
+        if len(self.buffer) > 0:
+            self.file.write('\n'.join(self.buffer) + '\n')
+            self.buffer = []
+
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def checkpoint(self):
+        """Saves the whole game, then starts the journal over (the turns in it are in the save)."""
+        snapshot = Save.save(self.game, self.index)
+        snapshot['journal'] = self.sequence #Turns up to here are in this save
+        write_synced(self.path, Save.dumps(snapshot))
+
+        #The turns written down are all in the checkpoint now
+        self.buffer = []
+        self.file.close()
+        self.file = open(self.log_path, 'w')
+        self.flush()
+        self.since_checkpoint = 0
+
+    def close(self):
+        if self.file != None:
+            self.flush()
+            self.file.close()
+            self.file = None
+
+        if self.game != None:
+            self.game.journal = None
+
+#Writes the text to the file, so it's either all there or the old file is (even if we crash)
+def write_synced(path, text):
+    with open(path + '.tmp', 'w') as file:
+        file.write(text)
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(path + '.tmp', path)
+
+#Gives back the turns in the journal, stopping at a line that was only half written
+def read_journal(log_path):
+    turns = []
+
+    if os.path.exists(log_path):
+        with open(log_path) as file:
+            for line in file:
+                try:
+                    turns.append(json.loads(line))
+
+                except ValueError: #Where it crashed while writing
+                    break
+
+    return turns
+
+def recover(path, game, index, player=None):
+    """Puts a game that hasn't been played yet back to where the journal left off, gives
+    back the number of the last turn (to attach a new journal with). The index is the same
+    as for Save.restore. The player is the one the game was started with (a game spawned
+    with a player already has them)."""
+    if player != None:
+        game.player = player
+
+    if game.player == None: #Starting the game would make an empty one, and restoring needs one
+        raise ValueError("Can't recover a game without it's player, give the player the game was started with")
+
+    sequence = 0
+    turns = read_journal(path + '.log')
+    write_line, game.write_line = game.write_line, lambda line: None #Nothing to show
+    journal, game.journal = game.journal, None #Don't write these down again
+
+    if os.path.exists(path): #Start from the checkpoint
+        with open(path) as file:
+            snapshot = Save.loads(file.read())
+
+        Save.restore(game, snapshot, index)
+        sequence = snapshot.get('journal', 0)
+
+    elif len(turns) > 0: #Start from the start of the game
+        game.start()
+
+    for number, moves, commands in turns:
+        if number <= sequence: #Already in the checkpoint
+            continue
+
+        replay_turn(game, moves, commands)
+        sequence = number
+
+    game.write_line, game.journal = write_line, journal
+    return sequence
+
+#Plays the commands of a turn again, the same as the game did
+def replay_turn(game, moves, commands):
+    for command in commands:
+        game.command = command
+        game.execute[command[0][0]](game)
+
+    game.command = []
+    game.moves = moves
+
+    if game.playing: #The events happen after every turn
+        game.check_events()
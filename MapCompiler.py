@@ -0,0 +1,294 @@
+"""
+Checks and compiles the maps of a game. Every map is walked once from
+it's first room to find what can be reached (keeping track of locked
+exits, and the keys that can be picked up before them), the rooms that
+can't be reached, the dead ends, and if the end of the map can be
+reached at all. The shortest paths between the rooms are kept as tables
+of which direction to go next, so hints and actors can find their way
+with a lookup instead of a search every turn. Paths only go through
+exits that are open, or that the key can be found for.
+Compiled maps are kept by the game they're for (by the first room), so
+a map is only compiled once (again if an exit is locked or unlocked),
+and are let go of along with the map once the game leaves it behind.
+Run 'python MapCompiler.py' to check the maps of the test game.
+Date: 10/18/26
+"""
+from Tools import DIRECTIONS, Exit
+from array import array
+
+#Maps with at most this many rooms have the path to every room worked out when compiled,
+#bigger maps only work out the paths to a room the first time they're asked for
+ALL_PAIRS_LIMIT = 1000
+
+NO_DIRECTION = -1 #In the tables of directions, there is no way to go from here
+NO_DISTANCE = -1 #And in the tables of distances
+
+#Gives back every item in these items, and the items inside of them
+def items_within(items):
+    found = []
+
+    for item in items:
+        found.append(item)
+
+        if type(item).__name__ in ['Container', 'Actor']:
+            found.extend(items_within(item.items))
+
+    return found
+
+#What a map is like, worked out once. Nodes are the rooms, transistions and ends
+#of the map, numbered in the order they were found
+class CompiledMap:
+    def __init__(self, graph, player=None, rooms=()):
+        """Graph is the first room of a map. Player (if given) starts with their
+        inventory's keys, and rooms are any other rooms made for the map (so they can
+        be found, even if nothing leads to them)."""
+        self.graph = graph
+        self.nodes = [] #Every node found
+        self.numbers = {} #Node -> number of that node
+        self.exits = [] #Number of a node -> list of (direction, exit) going out of it
+        self.entrances = [] #Number of a node -> list of (number of the node, direction) that can come into it
+        self.hops = {} #Number of a node -> table of the direction to go in to get there, from every node
+        self.distances = {} #Number of a node -> table of how far it is, from every node
+        self.lock_changes = Exit.changes #Locks changed since this, and it's out of date
+        self.compile(player, rooms)
+
+    def compile(self, player, rooms):
+        for node in [self.graph] + list(rooms):
+            self.add(node)
+
+        #Find every node, going through the nodes as they are found
+        position = 0
+        while position < len(self.nodes):
+            for direct, exit in self.exits[position]:
+                self.add(exit.room)
+
+            position += 1
+
+        self.find_reachable(player)
+
+        #Paths only go through the exits that are open, or that the key can be found for
+        for number, exits in enumerate(self.exits):
+            for direct, exit in exits:
+                if exit.locked != True or exit.key in self.keys:
+                    self.entrances[self.numbers[exit.room]].append((number, direct))
+        self.ends = [n for n, node in enumerate(self.nodes) if type(node).__name__ in ['Transistion', 'End']]
+        self.dead_ends = [node for n, node in enumerate(self.nodes)
+                          if type(node).__name__ == 'Room' and n in self.reachable and len(self.exits[n]) == 1]
+
+        #Rooms the player can get to, but never get out of to the end of the map
+        to_end = self.distances_to(self.ends)
+        self.trapped = [node for n, node in enumerate(self.nodes) if n in self.reachable and to_end[n] == NO_DISTANCE]
+
+        if len(self.nodes) <= ALL_PAIRS_LIMIT: #Small enough to work out every path now
+            for goal in range(len(self.nodes)):
+                self.paths_to(goal)
+
+    def add(self, node):
+        """Gives back the number of this node, numbering it if it's new."""
+        number = self.numbers.get(node)
+
+        if number == None:
+            number = self.numbers[node] = len(self.nodes)
+            self.nodes.append(node)
+            self.entrances.append([])
+
+            if type(node).__name__ == 'Room':
+                self.exits.append([(direct, exit) for direct, exit in enumerate(node.exits) if exit != None])
+
+            else: #Transistions and ends don't lead anywhere
+                self.exits.append([])
+
+        return number
+
+    #Walks the map from the first room, only through the exits that are unlocked (or that
+    #the key has been found for), until there are no new keys to open more of the map with
+    def find_reachable(self, player):
+        keys = set(items_within(player.inventory)) if player != None else set()
+        self.reachable = set([0])
+        locked = [] #Locked exits reached, with the key not found yet
+        found = [0]
+
+        while len(found) > 0:
+            #Walk through every exit that is open, to the nodes not reached yet
+            position = 0
+            while position < len(found):
+                number = found[position]
+                position += 1
+
+                if type(self.nodes[number]).__name__ == 'Room':
+                    keys.update(items_within(self.nodes[number].items))
+
+                for direct, exit in self.exits[number]:
+                    target = self.numbers[exit.room]
+
+                    if exit.locked == True and exit.key not in keys:
+                        locked.append(exit)
+
+                    elif target not in self.reachable:
+                        self.reachable.add(target)
+                        found.append(target)
+
+            #Then go on through the locked exits the keys have been found for
+            found, still_locked = [], []
+
+            for exit in locked:
+                target = self.numbers[exit.room]
+
+                if exit.key not in keys:
+                    still_locked.append(exit)
+
+                elif target not in self.reachable:
+                    self.reachable.add(target)
+                    found.append(target)
+
+            locked = still_locked
+
+        self.keys = keys #Every key that can be found
+        #Exits that stay locked, since their key is nowhere the player can get to
+        self.locked_out = [exit for exit in locked if self.numbers[exit.room] not in self.reachable]
+        self.unreachable = [node for n, node in enumerate(self.nodes) if n not in self.reachable]
+
+    def distances_to(self, goals):
+        """Gives back how far every node is from the nearest of these nodes (by number)."""
+        return self.search(goals)[1]
+
+    def paths_to(self, goal):
+        """Gives back the tables of the direction to go in, and how far it is, to get
+        to this node (by number) from every node. Worked out the first time it's asked for."""
+        if goal not in self.hops:
+            self.hops[goal], self.distances[goal] = self.search([goal])
+
+        return self.hops[goal], self.distances[goal]
+
+    #Searches out from the goals, backwards through the exits coming into them
+    def search(self, goals):
+        hops = array('b', [NO_DIRECTION]) * len(self.nodes)
+        distances = array('i', [NO_DISTANCE]) * len(self.nodes)
+        frontier = list(goals)
+
+        for goal in goals:
+            distances[goal] = 0
+
+        distance = 0
+        while len(frontier) > 0:
+            distance += 1
+            next_frontier = []
+
+            for number in frontier:
+                for came_from, direct in self.entrances[number]:
+                    if distances[came_from] == NO_DISTANCE:
+                        distances[came_from] = distance
+                        hops[came_from] = direct
+                        next_frontier.append(came_from)
+
+            frontier = next_frontier
+
+        return hops, distances
+
+    def next_direction(self, start, goal):
+        """Gives back the name of the direction to go in from the start, to get to the
+        goal the quickest (none if it can't be gotten to, or is where we are)."""
+        direct = self.paths_to(self.numbers[goal])[0][self.numbers[start]]
+        return None if direct == NO_DIRECTION else DIRECTIONS.names[direct]
+
+    def distance(self, start, goal):
+        """Gives back how many moves it takes to get to the goal from the start (none if it can't)."""
+        distance = self.paths_to(self.numbers[goal])[1][self.numbers[start]]
+        return None if distance == NO_DISTANCE else distance
+
+    def path(self, start, goal):
+        """Gives back the directions to go in to get from the start to the goal (none if it can't)."""
+        hops, distances = self.paths_to(self.numbers[goal])
+        number = self.numbers[start]
+
+        if distances[number] == NO_DISTANCE:
+            return None
+
+        path = []
+        while distances[number] > 0:
+            path.append(DIRECTIONS.names[hops[number]])
+            number = self.step(number, hops[number])
+
+        return path
+
+    #Gives back the number of the node gone to, going this way from this node
+    def step(self, number, direct):
+        return self.numbers[self.nodes[number].get_exit(direct).room]
+
+    def problems(self):
+        """Gives back a line for each thing that is wrong (or could be) with this map."""
+        lines = []
+
+        for node in [x for x in self.unreachable if type(x).__name__ == 'Room']:
+            lines.append("{} can't be reached".format(node_name(node)))
+
+        for exit in self.locked_out:
+            lines.append("The way from {} to {} is locked, and the key can't be found before it (only an event can open it)".format(
+                node_name(exit.origin), node_name(exit.room)))
+
+        if len(self.ends) == 0:
+            lines.append("There is no way to the end of this map")
+
+        elif not any(n in self.reachable for n in self.ends):
+            lines.append("The end of this map can't be reached")
+
+        else: #Otherwise it's every room
+            for node in self.trapped:
+                lines.append("There's no way to the end from {}".format(node_name(node)))
+
+        return lines
+
+    def report(self):
+        """Gives back a summary of the map and it's problems, as text."""
+        rooms = [n for n, node in enumerate(self.nodes) if type(node).__name__ == 'Room']
+        reachable = sum(1 for n in rooms if n in self.reachable)
+        lines = ["{} rooms, {} reachable, {} dead ends".format(len(rooms), reachable, len(self.dead_ends))]
+
+        if len(self.dead_ends) > 0:
+            lines.append("  Dead ends: " + ", ".join(node_name(node) for node in self.dead_ends))
+
+        return '\n'.join(lines + ["  " + line for line in self.problems()])
+
+#Gives back the name of a node, to tell the user
+def node_name(node):
+    type_name = type(node).__name__
+
+    if type_name == 'Room':
+        return "'{}'".format(node.name)
+
+    return "the " + type_name.lower()
+
+def compile_map(game, graph, player=None, rooms=()):
+    """Gives back the compiled map of the game that starts at this room, compiling it if
+    it hasn't been yet (or an exit has been locked or unlocked since). What can be reached
+    depends on the player's keys, so a map compiled for a player (or with other rooms) is never kept."""
+    if player != None or len(rooms) > 0:
+        return CompiledMap(graph, player, rooms)
+
+    compiled = game.compiled_maps.get(graph.uid)
+
+    if compiled == None or compiled.lock_changes != Exit.changes:
+        compiled = game.compiled_maps[graph.uid] = CompiledMap(graph)
+
+    return compiled
+
+def forget_map(game, graph):
+    """Forgets the compiled map, so it's compiled again (after changing the map)."""
+    game.compiled_maps.pop(graph.uid, None)
+
+def check_maps(game, player=None):
+    """Compiles every map of the game, and gives back a report on all of them."""
+    lines = []
+
+    for number, graph in enumerate(game.maps):
+        if type(graph).__name__ == 'Room':
+            lines.append("Map {}: {}".format(number + 1, compile_map(game, graph, player).report()))
+
+    return '\n'.join(lines)
+
+if __name__ == '__main__':
+    from Game import GameEngine
+    from testGame import build_world
+
+    game = GameEngine([])
+    print(check_maps(game, build_world(game)))
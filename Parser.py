@@ -5,8 +5,10 @@ into english sentences for use.
 Date: 3/1/19
 Author: Alastar Slater
 """
-from functools import reduce
-from vocabParser import read_vocab #So we can read from vocab list ot get most vocab
+from functools import reduce, lru_cache
+from vocabParser import load_vocab #So we can read from vocab list ot get most vocab
+import re
+import os
 
 WORD         = "WORD" #A random word in the language
 NOUN         = "NOUN" #A noun in the language
@@ -35,7 +37,9 @@ def get_dict(name):
 
     return words
             
-vocab = read_vocab('vocab.txt') #Get the vocabulary
+#The vocabulary file is next to this file (loaded from it's compiled version when possible)
+VOCAB_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'vocab.txt')
+vocab = load_vocab(VOCAB_FILE) #Get the vocabulary
 #List of conjunctions in the language
 PHRASES = ["a"] #Notes start of a sub sentence
 QUOTES = ["xae"] #Notes start of quotation
@@ -55,6 +59,8 @@ VOWELS = vocab['vowels']
 ###################
 
 class Token:
+    __slots__ = ('type', 'value', 'line', 'column') #No instance dict, made for every word
+
     def __init__(self, tok_type, value, line=0, column=0):
         self.type = tok_type #type of this particular token
         self.value = value #Token itself
@@ -155,14 +161,71 @@ class Lexer:
         #Return the list of tokens with an eof token at end
         return tokens + [self.get_next_token()]
 
+#Lexer that finds every word in the input in one pass of a compiled regular expression,
+#gives back the same tokens (and error state) as the Lexer
+class RegexLexer:
+    #Pattern that matches every word in the input
+    WORD_PATTERN = re.compile("[{}]+".format(re.escape(ALPHABET)))
+
+    def __init__(self, sentence):
+        self.text = sentence.lower()
+        self.line = 1 #Line and column of the last character looked at
+        self.column = 1
+        self.error = False #If an error occured
+        self.base = -1 #Columns count from the character before the last new line
+
+    #Checks for unrecognized characters in between words, updating the line and
+    #column to the end of it (a new line is column 1 of the next line)
+    def skip_gap(self, start, end):
+        if start == end: return
+
+        gap = self.text[start:end]
+
+        #Anything that isn't whitespace is an unrecognized character
+        if not gap.isspace():
+            self.error = True
+
+        #Only the gaps can have new lines, the first character never counts
+        newlines = gap.count('\n', 1 if start == 0 else 0)
+
+        if newlines > 0:
+            self.line += newlines
+            self.base = start + gap.rfind('\n') - 1
+
+    def get_tokens(self):
+        tokens = []
+        pos = 0
+
+        #Empty input has no tokens at all
+        if self.text.strip() == "":
+            return [Token(EOF, EOF, self.line, self.column)]
+
+        for match in self.WORD_PATTERN.finditer(self.text):
+            start, end = match.span()
+            self.skip_gap(pos, start) #What is in between the words
+            tokens.append(Token(WORD, match.group(), self.line, start - self.base))
+            pos = end
+
+        self.skip_gap(pos, len(self.text)) #After the last word
+
+        #The end is located at the last character
+        self.column = len(self.text) - 1 - self.base
+
+        #Return the list of tokens with an eof token at end
+        return tokens + [Token(EOF, EOF, self.line, self.column)]
+
+#Lexer used when one isn't picked, either Lexer or RegexLexer
+DEFAULT_LEXER = RegexLexer
+
 #############################
 #      WORD CLASSIFIER      #
 #############################
 
-#Uses closures to change a tokens value
+#Uses closures to change a tokens type (in place, the token isn't copied)
 def change_type(token):
     def __changer(tok_type):
-        return Token(tok_type, token.value, token.line, token.column) 
+        token.type = tok_type
+        return token
 
     return __changer
 
@@ -181,11 +244,13 @@ def word_exact(target, dictionary):
     )
 
 #Does inexact classification of words, given the word type as a string
-#(and assuming it has a list of those words under <type>s, such as VERB -> VERBS)
+#(the words for that type are looked up in the registry of word classes)
 def inexact_class(word_type, words):
+    table = WORD_CLASSES.tables[word_type] #Bind the words before classifying
+
     return (
-        change_type(tok)(eval(word_type))
-        if word_isin(tok.value, eval(word_type + 'S')) and tok.type == WORD
+        change_type(tok)(word_type)
+        if tok.type == WORD and word_isin(tok.value, table)
         else tok
 
         for tok in words
@@ -201,14 +266,20 @@ def inexact_classify(word_types, words):
 #Classifies word types that don't have affixes
 def exact_classify(word_types, words):
     for word_type in word_types:
-        #Try to use every exact classification to classify these words
-        words = (change_type(tok)(word_type)
-                 if tok.value in eval(word_type + 'S')
-                 else tok
-                 for tok in words)
+        words = exact_class(word_type, words)
 
     return words #Return the words.
 
+#Does exact classification of words for a single word type
+def exact_class(word_type, words):
+    table = WORD_CLASSES.tables[word_type] #Bind the words before classifying
+
+    #Try to use this exact classification to classify these words
+    return (change_type(tok)(word_type)
+            if tok.value in table
+            else tok
+            for tok in words)
+
 #Classifies a word as an adverb
 def classify_adverbs(target): 
     for word in target:
@@ -218,14 +289,16 @@ def classify_adverbs(target):
         else:
             yield word
 
-#Classifies all the words in the sentence
-def classify(sentence):
+#Classifies all the words in the sentence through the original generator chain
+#(kept as the reference that the compiled classifier below must agree with)
+def chain_classify(sentence):
     lexer = Lexer(sentence) #Our lexer this time
     toks = lexer.get_tokens() #Gets tokens
     #toks = classify_conjuncs(toks)
     #toks = classify_adverbs(toks) #Classify adverbs first
-    #Classify words without affixes
-    toks = exact_classify(['INTERJECT', 'QUOTE'], toks)
+    #Classify words without affixes (this used to be given INTERJECT as well, but
+    #it's generators were only ran after the loop, so both checked for QUOTE)
+    toks = exact_classify(['QUOTE'], toks)
     #Classify words that use affixes
     toks = inexact_classify(['NOUN', 'ADJECTIVE', 'VERB'], toks)
 
@@ -253,13 +326,243 @@ def classify(sentence):
     #print("TOKS : ", list(toks))
 
     return (x for x in toks), lexer.error
+
+#Aho-Corasick automaton over the roots of every word type that uses affixes.
+#A token is scanned once, so it is classified in time proportional to its length
+#instead of testing every root in the dictionary against it.
+class MorphemeTrie:
+    def __init__(self, word_types):
+        """word_types is a list of (token type, roots) pairs in the order they are
+        tried, the first type that has a root inside of the token is used."""
+        self.types = [tok_type for tok_type, roots in word_types]
+        self.goto = [{}] #Character transitions out of each state
+        self.fail = [0] #Failure link of each state
+        self.out = [0] #Bitmask of the word types with a root ending at each state
+
+        #Put every root into the trie, marking the type it belongs to
+        for n, (tok_type, roots) in enumerate(word_types):
+            for root in roots:
+                self.add(root, 1 << n)
+
+        self.link() #Setup failure links
+
+    #Adds a single root into the trie
+    def add(self, root, mask):
+        state = 0
+
+        for char in root:
+            if char not in self.goto[state]: #Make a new state for this char
+                self.goto[state][char] = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(0)
+
+            state = self.goto[state][char]
+
+        self.out[state] |= mask #Note that a root ends here
+
+    #Builds the failure links breadth first, merging the outputs along them
+    def link(self):
+        queue = list(self.goto[0].values())
+
+        for state in queue:
+            for char, child in self.goto[state].items():
+                fail = self.fail[state]
+
+                #Follow failure links until this char can be matched
+                while fail != 0 and char not in self.goto[fail]:
+                    fail = self.fail[fail]
+
+                self.fail[child] = self.goto[fail].get(char, 0)
+                self.out[child] |= self.out[self.fail[child]]
+                queue.append(child)
+
+    #Returns the type of the word, or None if it contains no roots
+    def classify(self, word):
+        goto, fail, out = self.goto, self.fail, self.out
+        found = out[0] #Types of roots found in the word so far
+        state = 0
+
+        for char in word:
+            while state != 0 and char not in goto[state]:
+                state = fail[state]
+
+            state = goto[state].get(char, 0)
+            found |= out[state]
+
+            if found & 1: #Can't do better than the first type, stop early
+                break
+
+        if found == 0: return None
+
+        #The lowest bit is the first type that matched
+        return self.types[(found & -found).bit_length() - 1]
+
+#How the words of a class are matched against a token
+GRAMMAR = "grammar" #Always given this type, even if already classified
+EXACT   = "exact" #Whole word must be in the class
+AFFIXED = "affixed" #Word has a root of the class inside of it (with affixes)
+
+#Registry of all the word classes, which maps each token type to a frozen table
+#of it's words. Classes registered earlier win when a word is in more than one.
+class WordClasses:
+    def __init__(self):
+        self.tables = {} #Token type -> frozenset of words
+        self.kinds = {} #Token type -> how words are matched (or None for lookups only)
+        self.version = 0 #Changes every time the classes change
+        self.build()
+
+    def register(self, tok_type, words, kind=None):
+        """Registers (or replaces) a word class. GRAMMAR words are always given
+        this type, EXACT words have to match the whole token, and AFFIXED words are
+        roots found inside of the token. A kind of None only keeps the table."""
+        if kind not in [GRAMMAR, EXACT, AFFIXED, None]:
+            print("RUNTIME ERROR: UNKNOWN KIND OF WORD CLASS '{}'".format(kind))
+            raise SystemExit
+
+        self.tables[tok_type] = frozenset(words)
+        self.kinds[tok_type] = kind
+        self.build() #Rebuild the classifier with this class
+
+    def build(self):
+        """Orders the classes by kind, and compiles the trie for affixed words."""
+        classes = [(tok_type, self.kinds[tok_type], table) for tok_type, table in self.tables.items()]
+
+        self.grammar = [(tok_type, table) for tok_type, kind, table in classes if kind == GRAMMAR]
+        self.exact = [(tok_type, table) for tok_type, kind, table in classes if kind == EXACT]
+        self.trie = MorphemeTrie([(tok_type, table) for tok_type, kind, table in classes if kind == AFFIXED])
+        self.version += 1
+
+    #Gives the type of a single token, same as it going through chain_classify
+    def classify_token(self, tok):
+        #The grammar words are always given their own type
+        for tok_type, table in self.grammar:
+            if tok.value in table:
+                tok.type = tok_type
+                return tok
+
+        if tok.type != WORD: #Already has a type (EOF)
+            return tok
+
+        #Classify words without affixes first
+        for tok_type, table in self.exact:
+            if tok.value in table:
+                tok.type = tok_type
+                return tok
+
+        #Then try the words that use affixes
+        word_type = self.trie.classify(tok.value)
+
+        if word_type != None: #Reclassify in place
+            tok.type = word_type
+
+        return tok
+
+#All of the word classes of the language
+WORD_CLASSES = WordClasses()
+WORD_CLASSES.register(CONJUNC, CONJUNCS, GRAMMAR)
+WORD_CLASSES.register(PHRASE, PHRASES, GRAMMAR)
+WORD_CLASSES.register(QUOTE, QUOTES, EXACT)
+WORD_CLASSES.register(NOUN, NOUNS, AFFIXED)
+WORD_CLASSES.register(ADJECTIVE, ADJECTIVES, AFFIXED)
+WORD_CLASSES.register(VERB, VERBS, AFFIXED)
+#Only kept for lookups, there is no grammar rule for these yet
+WORD_CLASSES.register(ADVERB, ADVERBS)
+WORD_CLASSES.register(INTERJECT, INTERJECTS)
+
+#Lets games add their own word classes
+register_word_class = WORD_CLASSES.register
+
+#Gives the type of a single token
+def classify_token(tok):
+    return WORD_CLASSES.classify_token(tok)
+
+#Classifies all the words in the sentence (with the lexer given, or the default one)
+def classify(sentence, lexer=None):
+    lexer = (DEFAULT_LEXER if lexer == None else lexer)(sentence) #Our lexer this time
+    toks = lexer.get_tokens() #Gets tokens
+
+    classify_tok = WORD_CLASSES.classify_token #Bind classifier once for the sentence
+
+    return (classify_tok(tok) for tok in toks), lexer.error
         
+#####################
+#      AFFIXES      #
+#####################
+
+#Affix tables for each word type, (affix, affix type) pairs
+VERB_PREFIXES = (("XI", 0), ("KO", 1), ("LO", 2))
+VERB_SUFFIXES = (("BI", 3), ("BO", 4), ("BE", 4), ("LA", 5), ("LE", 5))
+ADVERB_PREFIXES = (("LO", 0),)
+ADJECTIVE_PREFIXES = (("LO", 0), ("BI", 1), ("BA", 1))
+NOUN_PREFIXES = (("RE",0),("RA",0),("RI",0),("RO",0),("TI",0),("TA",0))
+NOUN_SUFFIXES = (("NI",1), ("NO",1), ("GA", 2), ("GI", 2), ("GO", 2),
+                 ("GE",2), ("GOA",2), ("GOE",2), ("KA",3), ("KE",3))
+
+AFFIX_CACHE_SIZE = 4096 #Most words that have their affixes remembered
+
+def prefix_removal(word, affixes): #collects and removes all affixes on the front
+    affix_list = [] #list of all collected affixes
+    i = 0
+    while i < len(affixes):
+        affix = affixes[i]
+
+        prefix = word[: len(affix)] #The potential prefix
+        result = word[len(affix):] #potential result
+
+        #Save the removed affix
+        if prefix == affix[0].lower():
+            affix_list.append(affix)
+            word = result
+            continue #Make sure there isn't a copy
+
+        else:  #Move to next affix
+            i += 1
+
+    #Return list of affixes and the word
+    return affix_list, word
+
+def suffix_removal(word, affixes): #Collects and removes all suffixes
+    affixes = affixes[::-1] #Reverse list
+
+    affix_list = [] #List of affixes that where there
+    i = 0
+    while i < len(affixes):
+        affix = affixes[i] #Current affix
+        result = word[0: len(word) - len(affix)] #Get potential result
+        real_affix = word[len(result):] #get the potential affix
+
+        if affix[0].lower() == real_affix: #If they match, add it
+            affix_list.append(affix)
+            word = result #update the result
+            continue #Make sure there isn't a copy
+
+        else: #Otherwise, go to the next affix
+            i += 1
+
+    return affix_list, word
+
+#Collects and removes the prefixes and suffixes, returns the root word + tuple of affixes.
+#The same inflected words come up all the time, so recent words are remembered
+#(hits and misses can be seen with decompose.cache_info())
+@lru_cache(maxsize=AFFIX_CACHE_SIZE)
+def decompose(word, prefixes, suffixes):
+    #Remove all of the prefixes from the word
+    affix_list, word = prefix_removal(word, prefixes)
+    #Remove all the suffixes from the word
+    affix_list2, word = suffix_removal(word, suffixes)
+
+    #Return the root word and the affixes
+    return word, tuple(affix_list + affix_list2)
+
 ####################
 #      PARSER      #
 ####################
 
 #A full sentence in this language
 class Sentence(object):
+    __slots__ = ('subject', 'dir_object', 'indir_object', 'quote', 'verb_phrase')
+
     def __init__(self):
         self.subject = None
         self.dir_object = None
@@ -269,6 +572,8 @@ class Sentence(object):
 
 #Connects two phrases by a conjunction
 class Conjunction(object):
+    __slots__ = ('left', 'conjunc', 'right', 'split')
+
     def __init__(self, left_phrase, conjunc, right_phrase):
         self.left = left_phrase #Phrase left of conjunction
         self.conjunc = conjunc #Conjunction being used
@@ -289,6 +594,8 @@ class Conjunction(object):
 
 #A noun phrase (Noun, possessor, adjectives)
 class NounPhrase(object):
+    __slots__ = ('noun', 'possessor', 'adjectives', 'split')
+
     def __init__(self):
         self.noun = None
         self.possessor = None
@@ -297,6 +604,8 @@ class NounPhrase(object):
 
 #A single noun (uses affixes for information)
 class Noun(object):
+    __slots__ = ('token', 'noun', 'prep', 'poss', 'plural', 'use')
+
     def __init__(self, token):
         self.token = token #Token this is built from
         self.noun = None #Word (root) itself
@@ -306,6 +615,8 @@ class Noun(object):
         self.use = 'subject' #If it is subject / dir obj / indir obj
 
 class Adjective(object):
+    __slots__ = ('token', 'word', 'intensifier', 'neg')
+
     def __init__(self, token):
         self.token = token #The token this is from
         self.word = None  #The word this is based on
@@ -314,12 +625,16 @@ class Adjective(object):
 
 #Makes an entire verb phrase
 class VerbPhrase(object):
+    __slots__ = ('verb', 'adverbs')
+
     def __init__(self):
         self.verb = None #The verb being used
         self.adverbs = [] #List of adverbs
 
 #A single verb (uses affixes for information)
 class Verb(object):
+    __slots__ = ('token', 'verb', 'able', 'infin', 'neg', 'type', 'intense', 'tense')
+
     def __init__(self, token):
         self.token = token #Token this is built from
         self.verb = None #Word (root) being done (action)
@@ -332,12 +647,16 @@ class Verb(object):
 
 #A quote- some text either said or written. 
 class Quote(object):
+    __slots__ = ('token', 'sentences')
+
     def __init__(self, token):
         self.token = token #Token this is built from
         self.sentences = [] 
 
 #A single adverb
 class Adverb(object):
+    __slots__ = ('token', 'word', 'neg', 'from_adjective', 'adjective')
+
     def __init__(self, token):
         self.token = token
         self.word = None
@@ -346,12 +665,12 @@ class Adverb(object):
         self.adjective = None #Adjective this is made from
 
 class NoOp(object):
-    pass
+    __slots__ = ()
 
 class Parser:
-    def __init__(self, sentence):
+    def __init__(self, sentence, lexer=None):
         #The list of tokens to use, and current error state
-        self.tokens, self.error = classify(sentence)
+        self.tokens, self.error = classify(sentence, lexer)
         self.current_token = next(self.tokens) #Get first token
         self.line = self.current_token.line #get line number
         self.column = self.current_token.column #Get column number
@@ -396,80 +715,34 @@ class Parser:
 
     #Checks that there is isn't more than one affix type
     def check_affixes(self, max_num, affixes, word, token, err='default'):
-        #Number of times an affix appeared
-        times = {n: 0 for n in range(max_num + 1)}
-
-        for affix in affixes:
-            times[affix[1]] += 1 #incriment this type
-
-
-            if times[affix[1]] > 1: #If there is more than one of this type, raise error
-                self.raise_error()
-                #if err == 'default': #Default error
-                #    print("There is a grammatical error in terms of the word '{}'".format(word))
-                #    print("You've used multiple affixes relating to one thing all on this word.")
-                #    print("(Example, using more than one possession affix on a noun.)")
-                #    print("Look at the word on Line {}, Column {}".format(token.line, token.column))
-                #    raise SystemExit
-
-                #else: #use custom error message
-                #    print("Relating to the word '{}' ..".format(word))
-                #    print(err)
-                #    print("Look at the word on Line {}, Column {}".format(token.line, token.column))
-                #    raise SystemExit
+        #If there is more than one of any type, raise error
+        if len(set(affix[1] for affix in affixes)) < len(affixes):
+            self.raise_error()
+            #if err == 'default': #Default error
+            #    print("There is a grammatical error in terms of the word '{}'".format(word))
+            #    print("You've used multiple affixes relating to one thing all on this word.")
+            #    print("(Example, using more than one possession affix on a noun.)")
+            #    print("Look at the word on Line {}, Column {}".format(token.line, token.column))
+            #    raise SystemExit
+
+            #else: #use custom error message
+            #    print("Relating to the word '{}' ..".format(word))
+            #    print(err)
+            #    print("Look at the word on Line {}, Column {}".format(token.line, token.column))
+            #    raise SystemExit
 
     def prefix_removal(self, word, affixes): #collects and removes all affixes on the front
-        affix_list = [] #list of all collected affixes
-        i = 0
-        while i < len(affixes):
-            affix = affixes[i]
-            #Try taking off the prefix and potential result
-            #prefix, result = remove_front(word)
-
-            prefix = word[: len(affix)] #The potential prefix
-            result = word[len(affix):] #potential result
-
-            #Save the removed affix
-            if prefix == affix[0].lower():
-                affix_list.append(affix)
-                word = result
-                continue #Make sure there isn't a copy
-
-            else:  #Move to next affix
-                i += 1
-
-        #Return list of affixes and the word
-        return affix_list, word
+        return prefix_removal(word, affixes)
 
     def suffix_removal(self, word, affixes): #Collects and removes all suffixes 
-        affixes = affixes[::-1] #Reverse list
-
-        affix_list = [] #List of affixes that where there
-        i = 0
-        while i < len(affixes):
-            affix = affixes[i] #Current affix
-            result = word[0: len(word) - len(affix)] #Get potential result
-            real_affix = word[len(result):] #get the potential affix
-
-            if affix[0].lower() == real_affix: #If they match, add it
-                affix_list.append(affix)
-                word = result #update the result
-                continue #Make sure there isn't a copy
-
-            else: #Otherwise, go to the next affix
-                i += 1
-
-        return affix_list, word 
+        return suffix_removal(word, affixes)
 
     #Collects and removes the prefixes and suffixes, returns resulting word + affix list
     def affix_removal(self, prefixes, word, suffixes):
-        #Remove all of the prefixes from the word
-        affix_list, word = self.prefix_removal(word, prefixes)
-        #Remove all the suffixes from the word
-        affix_list2, word = self.suffix_removal(word, suffixes)
+        word, affixes = decompose(word, tuple(prefixes), tuple(suffixes))
 
         #Return the root word and the list of affixes
-        return word, affix_list + affix_list2
+        return word, list(affixes)
 
     def parse_all(self): #Parses EVERYTHING and sticks it into a paragraph (list)
         """
@@ -589,9 +862,9 @@ class Parser:
 
         #Get the root word and the list of affixes
         word, affixes = self.affix_removal(
-            [("XI", 0), ("KO", 1), ("LO", 2)], #Prefixes
+            VERB_PREFIXES, #Prefixes
             node.token.value,
-            [("BI", 3), ("BO", 4), ("BE", 4), ("LA", 5), ("LE", 5)] #suffixes
+            VERB_SUFFIXES #suffixes
             )
 
         node.verb = word #Save the root verb
@@ -629,9 +902,9 @@ class Parser:
 
         #Get the step word and affix list
         word, affixes = self.affix_removal(
-            [("LO", 0)],
+            ADVERB_PREFIXES,
             node.token.value,
-            []
+            ()
         )
 
         #Check for affix repeats
@@ -737,9 +1010,9 @@ class Parser:
 
         #Get the base word and affixes being used
         word, affixes = self.affix_removal(
-            [("LO", 0), ("BI", 1), ("BA", 1)],
+            ADJECTIVE_PREFIXES,
             node.token.value,
-            []
+            ()
         )
 
         node.word = word #Save the base word
@@ -775,13 +1048,12 @@ class Parser:
         #Get the root word and the list of affixes
         word, affixes = self.affix_removal(
             #All of the prefixes for this noun
-            [("RE",0),("RA",0),("RI",0),("RO",0),("TI",0),("TA",0)], 
+            NOUN_PREFIXES,
 
             node.token.value,
 
             #All of the suffixes for the noun
-            [("NI",1), ("NO",1), ("GA", 2), ("GI", 2), ("GO", 2),
-             ("GE",2), ("GOA",2), ("GOE",2), ("KA",3), ("KE",3) ]
+            NOUN_SUFFIXES
             )
 
         #Checks that multiple affixes of the same type weren't used
@@ -0,0 +1,184 @@
+"""
+Saves and restores the state of a game. The maps can't be saved as
+they are (events and uses are functions, and the exits link the rooms
+in circles), so instead every room, exit and item is numbered by
+walking the maps in the same order every time, and a save is only what
+has changed from how the world started (flags, where items are, locks,
+the inventory, score and moves), as compact JSON.
+Restoring applies those changes to a new copy of the world, such as a
+new instance spawned from the template (see World.py).
+Date: 10/18/26
+"""
+from Tools import WorldObject, Player
+import json
+
+SAVE_VERSION = 1 #Changes whenever saves are made differently
+
+#What's saved for each kind of object (everything playing the game can change)
+SAVED_FIELDS = {
+    'Room': ['description', 'visited', 'start_text_shown', 'player_here', 'items'],
+    'Exit': ['locked'],
+    'Item': ['description', 'attributes', 'collectable'],
+    'Container': ['description', 'attributes', 'collectable', 'is_open', 'items'],
+    'Actor': ['description', 'attributes', 'accept_items', 'loose_grip', 'items'],
+}
+
+#Every room, exit and item in a world, numbered in the order found walking the maps.
+#Made from a template (before it's played), so it also has how everything started
+class WorldIndex:
+    def __init__(self, maps, player=None):
+        self.maps = maps
+        self.objects = [] #Every object, in the order found
+        self.positions = {} #uid -> number of that object
+
+        for graph in maps:
+            self.add(graph)
+
+        if player != None: #Items the player starts with
+            for item in player.inventory:
+                self.add(item)
+
+        #Find everything, going through the objects as they are found
+        position = 0
+        while position < len(self.objects):
+            self.add_reachable(self.objects[position])
+            position += 1
+
+        #How every object started out
+        self.baseline = [self.fields(obj) for obj in self.objects]
+
+    def add(self, obj):
+        if isinstance(obj, WorldObject) and obj.uid not in self.positions:
+            self.positions[obj.uid] = len(self.objects)
+            self.objects.append(obj)
+
+    #Adds everything this object leads to (rooms through exits, items held)
+    def add_reachable(self, obj):
+        type_name = type(obj).__name__
+
+        if type_name == 'Room':
+            for exit in obj.exits:
+                self.add(exit)
+
+        elif type_name == 'Exit':
+            self.add(obj.room)
+            self.add(obj.key)
+
+        if type_name in ['Room', 'Container', 'Actor']:
+            for item in obj.items:
+                self.add(item)
+
+    def position(self, obj):
+        """Gives back the number of this object, objects made while playing can't be saved."""
+        if obj.uid not in self.positions:
+            raise ValueError(f"Can't save {type(obj).__name__} '{getattr(obj, 'name', '')}', it isn't in the world saved")
+
+        return self.positions[obj.uid]
+
+    def fields(self, obj, names=None):
+        """Gives back the saved fields of this object (held items are numbered), or
+        just the ones named."""
+        fields = {}
+
+        for field in SAVED_FIELDS[type(obj).__name__] if names == None else names:
+            value = getattr(obj, field)
+
+            if field == 'items':
+                value = [self.position(item) for item in value]
+
+            elif type(value).__name__ == 'list':
+                value = list(value)
+
+            fields[field] = value
+
+        return fields
+
+    def changed(self, game):
+        """Gives back the objects of the game that may have changed, with their numbers
+        and the fields of them that may have changed."""
+        if game.world == None: #Could be anything
+            return [(position, obj, SAVED_FIELDS[type(obj).__name__]) for position, obj in enumerate(self.objects)]
+
+        changed = []
+
+        #Only views that have been reached, and only fields they have set, could have changed
+        for uid, view in game.world.views.items():
+            if uid in self.positions:
+                names = [field for field in SAVED_FIELDS[type(view).__name__]
+                         if field in view.__dict__ or '_' + field in view.__dict__]
+
+                if len(names) > 0:
+                    changed.append((self.positions[uid], view, names))
+
+        return changed
+
+    def target(self, game, position):
+        """Gives back the game's object with this number."""
+        if game.world != None:
+            return game.world.view(self.objects[position])
+
+        return self.objects[position]
+
+def save(game, index):
+    """Gives back the state of the game as a dict that can be made into JSON. The index
+    is of the template the game was spawned from, or of the game's own maps (made before
+    the game was played)."""
+    objects = []
+
+    for position, obj, names in index.changed(game):
+        baseline = index.baseline[position]
+        changes = {field: value for field, value in index.fields(obj, names).items() if value != baseline[field]}
+
+        if len(changes) > 0:
+            objects.append([position, changes])
+
+    #The current room is a number, unless it's the end
+    room = game.current_room
+    room = index.position(room) if isinstance(room, WorldObject) else None
+
+    return {'version': SAVE_VERSION, 'size': len(index.objects), 'map': game.map_index, 'room': room,
+            'score': game.score, 'moves': game.moves, 'playing': game.playing,
+            'inventory': [index.position(item) for item in game.player.inventory],
+            'objects': sorted(objects)}
+
+def restore(game, snapshot, index, player=None):
+    """Puts the state saved into a game that hasn't been played yet (a new spawn of the
+    same template, or a new game built the same way, with the index made of it). The
+    player is the one the game would be started with, when the game has none yet (an
+    'empty' one is used otherwise, as start does)."""
+    if player != None:
+        game.player = player
+
+    elif game.player == None: #Not started, so there isn't one to carry the inventory
+        game.player = Player()
+
+    if snapshot['version'] != SAVE_VERSION or snapshot['size'] != len(index.objects):
+        raise ValueError("This save was made from a different world, or version of the game")
+
+    for position, changes in snapshot['objects']:
+        obj = index.target(game, position)
+
+        for field, value in changes.items():
+            if field == 'items':
+                value = [index.target(game, x) for x in value]
+
+            setattr(obj, field, value) #Marks the changes for the events as well
+
+    game.map_index = snapshot['map']
+    game.score = snapshot['score']
+    game.moves = snapshot['moves']
+    game.playing = snapshot['playing']
+    game.player.inventory = [index.target(game, x) for x in snapshot['inventory']]
+
+    if snapshot['room'] == None: #At the end of this map
+        game.current_room = game.get_map(game.map_index)
+
+    else:
+        game.current_room = index.target(game, snapshot['room'])
+
+def dumps(snapshot):
+    """Makes a save into compact JSON."""
+    return json.dumps(snapshot, separators=(',', ':'))
+
+def loads(text):
+    return json.loads(text)
@@ -0,0 +1,301 @@
+"""
+Serves a game to many players at once, over TCP. Every connection is
+a player with their own copy-on-write instance of the world (see
+World.py), one line of input is one turn. The maps, vocabulary and
+word classes are shared by every session, and
+lines are deconstructed in a pool of worker processes so one player's
+parse doesn't hold up everybody else. The workers are given the word
+classes the server has (new workers are started when they change). A line the parser gives up on, or
+takes too long with (the worker is stopped), is one nobody understands.
+Run a server with 'python Server.py serve [port]', or test one with
+'python Server.py load [clients] [turns] [port]'.
+Date: 10/18/26
+"""
+from concurrent.futures.process import BrokenProcessPool
+from Deconstructor import CommandCache, deconstruct_with_error, copy_command
+from Game import GameEngine
+from Parser import RegexLexer, WORD_CLASSES
+from testGame import build_world
+import multiprocessing
+import asyncio
+import time
+import sys
+
+PORT = 4000 #Default port the server is on
+PROMPT = "\n>" #Sent when the server is waiting for the next line
+PARSE_PROCESSES = 2 #Worker processes lines are deconstructed in
+PARSE_TIMEOUT = 2.0 #Seconds a line can take to deconstruct, before the worker is stopped
+
+#Starts a worker with the server's word classes, since it imports the parser fresh
+#(and only has the classes registered when Parser.py is imported)
+def start_worker(tables, kinds):
+    WORD_CLASSES.tables, WORD_CLASSES.kinds = tables, kinds
+    WORD_CLASSES.build()
+
+#Deconstructs a line in a worker, a line the parser gives up on (with SystemExit) is an error
+def parse_line(line, lexer):
+    try:
+        return deconstruct_with_error(line, lexer)
+
+    except (Exception, SystemExit):
+        return [], True
+
+#Gives a future it's result (or error), unless it already has one (or was given up on)
+def settle(future, result, error):
+    if future.done():
+        return
+
+    if error != None:
+        future.set_exception(error)
+
+    else:
+        future.set_result(result)
+
+#One player connected to the server, with their own game (and world)
+class Session:
+    def __init__(self, server, reader, writer):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.output = [] #Lines of output not sent yet
+        #Headless, turns are played one at a time in our own instance of the maps
+        self.game = server.template.spawn(server.player, [], self.output)
+        self.game.command_cache = CommandCache(0) #The server remembers lines for everybody
+
+    async def send(self, text=""):
+        """Sends all of the output so far (and the text after it), waiting only if
+        the player isn't keeping up with what's been sent."""
+        if len(self.output) > 0:
+            text = '\n'.join(self.output) + text
+            self.output.clear()
+
+        self.writer.write(text.encode())
+        await self.writer.drain()
+
+    async def run(self):
+        """Plays the game until the player leaves or it ends."""
+        self.game.start()
+
+        while self.game.playing:
+            await self.send(PROMPT)
+            data = await self.reader.readline()
+
+            if data == b"": #The player left
+                break
+
+            line = data.decode(errors='replace').strip()
+
+            if line != "": #Play a turn with this line
+                self.game.play_turn(*await self.server.deconstruct(line))
+                self.server.turns += 1
+
+        await self.send('\n') #Whatever was left, such as the ending
+
+class Server:
+    def __init__(self, build_world=build_world, processes=PARSE_PROCESSES, cache_size=4096, timeout=PARSE_TIMEOUT):
+        """Build world is called once with a game engine to make the world, and gives
+        back the player, every player gets their own instance of these. Lines are
+        deconstructed in a pool of that many processes, taking at most timeout seconds each."""
+        self.template = GameEngine([]) #Maps every player's world is an instance of
+        self.player = build_world(self.template)
+        self.lexer = RegexLexer #Lexer used on every player's input
+        self.command_cache = CommandCache(cache_size) #Lines deconstructed for any player
+        self.parsing = {} #Lines being deconstructed right now -> their future
+        self.sessions = 0 #How many players are connected
+        self.turns = 0 #Turns played by every player
+        self.processes = processes
+        self.timeout = timeout
+        self.pool = self.make_pool()
+        self.waiting = set() #Futures of the lines sent to the pool, not back yet
+        #Only as many lines as there are workers are sent at once, so the time limit is only on deconstructing
+        self.workers = asyncio.Semaphore(processes)
+
+    def make_pool(self):
+        #Spawned, so the workers don't get a copy of the players' connections
+        self.version = WORD_CLASSES.version #Of the word classes the workers have
+        context = multiprocessing.get_context('spawn')
+        return context.Pool(self.processes, start_worker, (WORD_CLASSES.tables, WORD_CLASSES.kinds))
+
+    def send(self, line):
+        """Sends a line to the pool, gives back a future of what it's deconstructed to."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.waiting.add(future)
+        future.add_done_callback(self.waiting.discard)
+
+        #The pool calls back from it's own thread
+        def done(result):
+            loop.call_soon_threadsafe(settle, future, result, None)
+
+        def failed(error):
+            loop.call_soon_threadsafe(settle, future, None, error)
+
+        self.pool.apply_async(parse_line, (line, self.lexer), callback=done, error_callback=failed)
+        return future
+
+    async def deconstruct(self, line):
+        """Gives back the statements and error state of this line, deconstructing it
+        in the pool if no player has sent it before."""
+        found = self.command_cache.lookup(line)
+
+        if found == None: #Deconstruct it without blocking the other players
+            key = self.command_cache.key(line)
+
+            if key not in self.parsing: #Nobody else is waiting on this line yet
+                self.parsing[key] = asyncio.ensure_future(self.parse(line, key))
+
+            #Shielded, so a player leaving doesn't cancel it for the others waiting
+            statements, error = await asyncio.shield(self.parsing[key])
+            found = copy_command(statements), error
+
+        return found
+
+    async def parse(self, line, key):
+        """Deconstructs a line in a worker and remembers it. A line that takes too long
+        is an error (and it's worker is stopped), so is one the worker fails on."""
+        found = [], True
+
+        try:
+            for attempt in range(2):
+                try:
+                    async with self.workers:
+                        if self.version != WORD_CLASSES.version: #Workers have the old classes
+                            self.restart(self.pool)
+
+                        pool = self.pool
+                        found = await asyncio.wait_for(self.send(line), self.timeout)
+                    break
+
+                except asyncio.TimeoutError: #Stuck, stop it so it doesn't hold up the other lines
+                    self.restart(pool)
+                    break
+
+                except BrokenProcessPool: #Stopped because of someone else's line, try it again
+                    continue
+
+                except Exception: #Couldn't be sent to the worker, or back
+                    break
+
+            #Bad lines are remembered too, so they're never deconstructed again
+            self.command_cache.remember(line, *found)
+
+        finally:
+            del self.parsing[key]
+
+        return found
+
+    def restart(self, pool):
+        """Stops the workers of this pool (if it's still the one used), and starts new ones."""
+        if pool is not self.pool: #Already restarted
+            return
+
+        waiting, self.waiting = self.waiting, set()
+        self.pool = self.make_pool()
+
+        #Lines waiting on the old workers fail, and are tried again with the new ones
+        for future in waiting:
+            settle(future, None, BrokenProcessPool("The workers were stopped"))
+
+        pool.terminate()
+
+    async def handle(self, reader, writer):
+        """Plays a game with the player on this connection."""
+        self.sessions += 1
+
+        try:
+            await Session(self, reader, writer).run()
+
+        except ConnectionError: #Player went away without saying so
+            pass
+
+        except SystemExit: #The game gave up on this player's world, only their session ends
+            pass
+
+        finally:
+            self.sessions -= 1
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=PORT):
+        """Starts listening for players, gives back the asyncio server."""
+        return await asyncio.start_server(self.handle, host, port)
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+#Commands the simulated players send, over and over (walking between two rooms and looking about)
+LOAD_COMMANDS = ['stexka paetbe', 'merbe', 'stixka paetbe', 'mogka merbe', 'motsnika merbe']
+
+#One simulated player, gives back how long (in seconds) each turn took to answer
+async def simulated_client(host, port, turns, commands=LOAD_COMMANDS):
+    reader, writer = await asyncio.open_connection(host, port)
+    latencies = []
+
+    try:
+        await reader.readuntil(PROMPT.encode()) #Start of the game
+
+        for turn in range(turns):
+            start = time.perf_counter()
+            writer.write((commands[turn % len(commands)] + '\n').encode())
+            await reader.readuntil(PROMPT.encode())
+            latencies.append(time.perf_counter() - start)
+
+    except asyncio.IncompleteReadError: #The game ended
+        pass
+
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+    return latencies
+
+#Gives back the value at this percent of the sorted values
+def percentile(values, percent):
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+async def load_test(clients=100, turns=50, host='127.0.0.1', port=None):
+    """Opens clients simulated players at once, who all play turns turns, then prints
+    the latency of a turn. Starts up a server here if no port is given."""
+    server = None
+
+    if port == None: #Test against a server in this process
+        game_server = Server()
+        server = await game_server.start(host, 0)
+        port = server.sockets[0].getsockname()[1]
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*[simulated_client(host, port, turns) for _ in range(clients)])
+    took = time.perf_counter() - start
+
+    if server != None:
+        while game_server.sessions > 0: #Let every session see their player leave
+            await asyncio.sleep(0.01)
+
+        server.close()
+        await server.wait_closed()
+        game_server.close()
+
+    latencies = sorted(x for result in results for x in result)
+    print("{} clients, {} turns in {:.3f}s ({:.0f} turns/s)".format(clients, len(latencies), took, len(latencies) / took))
+    print("  p50 {:.2f}ms  p99 {:.2f}ms  max {:.2f}ms".format(
+        percentile(latencies, 50) * 1000, percentile(latencies, 99) * 1000, latencies[-1] * 1000))
+
+async def serve(port=PORT):
+    server = await Server().start('127.0.0.1', port)
+    print("Serving on port {}".format(port))
+
+    async with server:
+        await server.serve_forever()
+
+if __name__ == '__main__':
+    args = sys.argv[1:] or ['serve']
+
+    if args[0] == 'serve':
+        asyncio.run(serve(*[int(x) for x in args[1:2]]))
+
+    elif args[0] == 'load':
+        asyncio.run(load_test(*[int(x) for x in args[1:3]], port=int(args[3]) if len(args) > 3 else None))
+
+    else:
+        print("Unknown command '{}', pick from: serve, load".format(args[0]))
+        raise SystemExit
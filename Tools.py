@@ -5,37 +5,252 @@ These will be used for builting up smaller components of the game.
 Author: Alastar Slater
 Date: 3/6/19
 """
-class Item: #Base class used in making more items
+from itertools import count
+
+#Every world object is given the next number from this when made, as it's identity
+UIDS = count()
+
+#What the condition of an event can say it depends on: the items held by the object
+#the event is on, the player's inventory, the exits of a room being locked or unlocked,
+#and a room being visited. Events that don't say what they depend on are checked every turn.
+EVENT_DEPENDS = ['items', 'inventory', 'locks', 'visited']
+
+#What the fingerprint of an object is made from (besides the items it holds and it's
+#exits), setting any of these forgets it. Lists of attributes are always replaced
+#(see Container.update_state), never changed in place, so this sees them change.
+FINGERPRINTED = frozenset(['name', 'description', 'attributes', 'room_name', 'collectable', 'is_open',
+                           'accept_items', 'loose_grip', 'room_start_text', 'start_text_shown', 'player_here'])
+
+#Base of the objects in a world (rooms, exits, items, containers and actors). They are
+#hashed and compared by their uid, which never changes, so they can be put in dicts
+#and sets quickly without the hash having to look through the rest of the world.
+#To compare what objects are like instead, use fingerprint().
+class WorldObject:
+    def __hash__(self):
+        return self.uid
+
+    def __eq__(self, other):
+        return self is other or getattr(other, 'uid', None) == self.uid
+
+    def __setattr__(self, attr, value):
+        object.__setattr__(self, attr, value)
+
+        #Only objects that have been asked for their fingerprint need to forget it
+        if attr in FINGERPRINTED and self.__dict__.get('_fingerprint') != None:
+            self.forget_fingerprint()
+
+    def fingerprint(self):
+        """Hash of what this object is like (rather than which object it is), objects that
+        look the same have the same fingerprint. Only good while the game is running. It's
+        kept until something it's made from changes, so asking again doesn't hash it again."""
+        #Read from our own dict, so a view (see World.py) never uses the template's
+        found = self.__dict__.get('_fingerprint')
+
+        if found == None:
+            found = self.__dict__['_fingerprint'] = self.make_fingerprint()
+
+        return found
+
+    def forget_fingerprint(self):
+        """Forgets the fingerprint of this object, and of everything holding it."""
+        obj = self
+
+        #Anything holding an object with no fingerprint has none either, so stop there
+        while obj != None and obj.__dict__.get('_fingerprint') != None:
+            obj.__dict__['_fingerprint'] = None
+            holder = obj.__dict__.get('_holder') #ItemList this object is in
+            obj = holder.owner if holder != None else None
+
+    def init_events(self):
+        """Sets up the events of this object, and the index of what they depend on."""
+        self.events = [] #Every event, in the order they were made
+        self.polled = {} #Events that are checked every turn
+        self.subscribers = {} #Thing that changed -> events that depend on it
+        self.pending = {} #Events to check next turn, since something they depend on changed
+        self.inventory_seen = None #Version of the player's inventory last checked against
+
+    def subscribe(self, event, depends):
+        """Adds an event. If depends is given (things from EVENT_DEPENDS) the event is only
+        checked after one of those has changed, otherwise it's checked every turn."""
+        self.events.append(event)
+
+        if depends == None: #Check this event every turn
+            self.polled[event] = True
+            return
+
+        for what in depends:
+            if what not in EVENT_DEPENDS:
+                raise ValueError(f"Events can't depend on '{what}', only on: {', '.join(EVENT_DEPENDS)}")
+
+            self.subscribers.setdefault(what, []).append(event)
+
+        self.pending[event] = True #Always checked on the first turn
+
+    def mark_changed(self, what):
+        """Notes that something events can depend on has changed for this object."""
+        if self.__dict__.get('_fingerprint') != None:
+            self.forget_fingerprint()
+
+        for event in self.subscribers.get(what, []):
+            self.pending[event] = True
+
+    def due_events(self, player):
+        """Gives back the events to check this turn, the ones checked every turn
+        and the ones where something they depend on changed."""
+        #Inventory changes are counted on the player, since they can happen anywhere
+        if 'inventory' in self.subscribers and player != None and self.inventory_seen != player.inventory_version:
+            self.inventory_seen = player.inventory_version
+            self.mark_changed('inventory')
+
+        if len(self.pending) == 0: #Nothing changed
+            return list(self.polled)
+
+        pending, self.pending = self.pending, {}
+        return [event for event in self.events if event in pending or event in self.polled]
+
+#A list of items which is also indexed by name, used for everything that holds items
+#(rooms, containers, actors and the player's inventory). Items are kept by their uid
+#(not by being alike) in insertion order, so taking out an item doesn't need a search,
+#and an item is found here from any view of it (see World.py).
+#The owner (if given) is told whenever the items change, as 'what' (for the events)
+class ItemList:
+    def __init__(self, items=(), owner=None, what='items'):
+        self.items = {} #item.uid -> item, in order
+        self.by_name = {} #Name -> {item.uid: item} with that name, in order
+        self.owner = None #Not told about the first items
+        self.what = what
+        self.extend(items)
+        self.owner = owner
+
+    def changed(self):
+        if self.owner != None: #Tell the owner the items have changed
+            self.owner.mark_changed(self.what)
+
+    def append(self, item):
+        """Adds the item to the end (an item that's already here stays where it is)."""
+        self.items[item.uid] = item
+        self.by_name.setdefault(item.name, {})[item.uid] = item
+        self.changed()
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def remove(self, item):
+        """Removes this item (not others that are alike)."""
+        if item.uid not in self.items:
+            raise ValueError("ItemList.remove(item): item not in list")
+
+        del self.items[item.uid]
+        named = self.by_name[item.name]
+        del named[item.uid]
+
+        if len(named) == 0: #No more items with this name
+            del self.by_name[item.name]
+
+        self.changed()
+
+    def find(self, name, attributes):
+        """Gives back a list of items with this name. If more than one has the name,
+        only keep the ones with all of the attributes (or no attributes if none given)."""
+        items = list(self.by_name.get(name, {}).values())
+
+        if len(items) > 1: #More than one item, use attributes
+            if attributes == []: #Get the items with no attributes
+                items = [item for item in items if item.attributes == []]
+
+            else: #Otherwise, get item with all matching attributes
+                wanted = set(attributes)
+                items = [item for item in items if wanted.issubset(item.attributes)]
+
+        return items
+
+    def fingerprint(self):
+        """Fingerprint of all of the items, in order. The items are told they're here, so
+        the owner's fingerprint is forgotten when one of them changes."""
+        for item in self:
+            item._holder = self
+
+        return hash(tuple(item.fingerprint() for item in self))
+
+    def __iter__(self): return iter(self.items.values())
+
+    def __len__(self): return len(self.items)
+
+    def __getitem__(self, index): return list(self.items.values())[index]
+
+    def __contains__(self, item): return getattr(item, 'uid', None) in self.items
+
+    def __eq__(self, other):
+        if type(other).__name__ in ['ItemList', 'list']:
+            return list(self) == list(other)
+
+        return False
+
+    def __str__(self): return f"ItemList({list(self)})"
+
+    def __repr__(self): return self.__str__()
+
+#Makes a property that always holds an ItemList (the items given are put into a new
+#ItemList), so the index stays right even when a whole new list is assigned.
+#Changes to the items are marked on the object as 'what'
+def item_list_property(attr, what='items'):
+    def get_items(self):
+        return getattr(self, attr)
+
+    def set_items(self, items):
+        if type(items).__name__ == 'ItemList': #Use this list, and be told of changes
+            items.owner, items.what = self, what
+
+        else:
+            items = ItemList(items, self, what)
+
+        setattr(self, attr, items)
+        self.mark_changed(what) #All of the items may be different
+
+    return property(get_items, set_items)
+
+#Makes a property for a flag that marks the object as changed (as 'what') whenever set
+def changing_property(attr, what):
+    def get_value(self):
+        return getattr(self, attr)
+
+    def set_value(self, value):
+        setattr(self, attr, value)
+        self.mark_changed(what)
+
+    return property(get_value, set_value)
+
+class Item(WorldObject): #Base class used in making more items
     def __init__(self, name="", description="", attributes=[], room_name=""):
+        self.uid = next(UIDS) #Identity of this item
+        self.init_events() #List of events for this item
         self.name = name
         self.description = description
         self.attributes = attributes #List of attributes / adjectives
         self.room_name = room_name #What the game says this object is in the room
         self.collectable = True #Can be collected by default
-        self.events = [] #List of events for this item
         self.uses = {} #dict. of item:action pairs for when a particular item is used on this item
 
-    def __hash__(self): #Return hash
-        texts = -(hash(self.name) * hash(self.description) + hash(self.room_name)) + hash(self.collectable)
-        events = sum(hash(x) for x in self.events)
-        uses = sum(hash(x) for x in list(self.uses) + list(self.uses.values()))
-
-        return uses * texts + events #return hash
-
-    #Checks the events for this item
+    #Checks the events for this item, gives back how many conditions were checked
     def check_events(self, game_engine):
-        for event in self.events: #Check every event
+        events = self.due_events(game_engine.player)
+
+        for event in events: #Check every event that's due
             #If condition is true, run function
             if event.__doc__(self) == True:
                 event(self, game_engine)
 
+        return len(events)
+
     #Makes an event for this item
-    def make_event(self, cond, event):
+    def make_event(self, cond, event, depends=None):
         """Adds an event. Condition takes only SELF, event is a function which takes SELF
         as well as taking the game engine being used. Condition returns a boolean, if 
-        true then the event is triggered. """
+        true then the event is triggered. Depends is a list of what the condition looks
+        at (from EVENT_DEPENDS), so it's only checked when those change."""
         event.__doc__ = cond #save the condition as the doc-string
-        self.events.append(event) #Add event to list of events
+        self.subscribe(event, depends) #Add event to list of events
 
     def use(self, item, engine): #try to use this item on person
         """Attempts to use this item (given) to interact with this object."""
@@ -52,17 +267,9 @@ class Item: #Base class used in making more items
         #If this item is used again, the action will be performed
         self.uses[item] = action
 
-    def __eq__(self, other):
-        #if types differ, return false
-        if type(self) != type(other): return False
-
-        #All of the information about this item
-        self_info = (self.name, self.description, self.attributes, self.room_name, self.collectable)
-        #info about the other item
-        other_info =(other.name, other.description, other.attributes, other.room_name, other.collectable)
-
-        #Return if these items are equal
-        return self_info == other_info
+    def make_fingerprint(self):
+        return hash((type(self).__name__, self.name, self.description, tuple(self.attributes),
+                     self.room_name, self.collectable))
 
 #Makes output text less clunky with plurals
 def last_item_plural(word):
@@ -72,26 +279,16 @@ def last_item_plural(word):
     else: return 'a ' + word
 
 class Container(Item):
+    items = item_list_property('_items') #All of the items contained within
+
     def __init__(self, name="", description="", attributes=[], room_name="", items=[]):
         #Put in the values for the item portion
         Item.__init__(self, name, description, attributes, room_name)
         self.items = items #all of the items contained within
         self.is_open = True #If the container is open (and things can be taken from it)
         self.update_state() #Check if this container is empty
-        self.events = [] #All of the events to check
         self.uses = {} #Dict. of how certain items interact with this container
 
-    def __hash__(self): #Return hash number
-        #Text hash sum
-        texts = hash(self.name) + hash(self.description) + hash(self.room_name)
-        attr = sum(hash(x) for x in self.attributes) #attribute hash sum
-        events = sum(hash(x) for x in self.events) #Event hash sum
-        #Sum of uses hashes
-        uses = sum(hash(x) for x in list(self.uses) + list(self.uses.values()))
-
-        #Return hash
-        return hash(self.is_open) * uses - events + attr + texts
-
     def use(self, item, engine):
         """Attempt to use this item (given) on this Container."""
         if item in self.uses: #Perform action if interactable
@@ -104,23 +301,11 @@ class Container(Item):
         """Item is some object, action is a function that takes self and the game engine being used."""
         self.uses[item] = action
 
-    def check_events(self, game_engine):
-        #Checks every event
-        for event in self.events:
-            #If event should be triggered, does action
-            if event.__doc__(self) == True:
-                event(self, game_engine)
-
-    def make_event(self, cond, event):
-        """Condition takes only SELF, and event takes SELF and the game engine.
-        Condition returns a boolean, if true, runs the event function."""
-        event.__doc__ = cond
-        self.events.append(event)
-
     #If the item has no items, add the 'empty' attribute
     def update_state(self):
         #If empty, add empty attribute
-        if len(self.items) == 0: self.attributes.append('empty')
+        #(a new list, since the list given may be shared, like the default one)
+        if len(self.items) == 0: self.attributes = self.attributes + ['empty']
         else: #Otherwise, remove any empty attributes
             self.attributes = [a for a in self.attributes if a != 'empty']
 
@@ -141,24 +326,17 @@ class Container(Item):
 
         return text
 
-    def __eq__(self, other):
-        #If types differ, return false
-        if type(self) != type(other): return False
-
-        #Information about this item
-        self_info = (self.name, self.description, self.attributes, self.room_name,
-                     self.collectable, self.items, self.is_open)
-
-        #Information about the other value
-        other_info = (other.name, other.description, other.attributes, other.room_name,
-                      other.collectable, other.items, self.is_open)
-
-        #Return if teh two values are equal
-        return self_info == other_info
+    def make_fingerprint(self):
+        #What this container is like, including what is inside of it
+        return hash((Item.make_fingerprint(self), self.is_open, self.items.fingerprint()))
 
 #An actor is any NPC (and user potentially) in the game
-class Actor:
+class Actor(WorldObject):
+    items = item_list_property('_items') #The items this actor possessess
+
     def __init__(self, name="", description="", attributes=[], room_name="", items=[]):
+        self.uid = next(UIDS) #Identity of this actor
+        self.init_events() #Actors have no events, but are told when their items change
         self.name = name
         self.description = description
         self.room_name = room_name #Referred to in the room
@@ -169,18 +347,6 @@ class Actor:
         self.attributes = attributes #Adjectives
         self.uses = {} #Dict. of ways items interact with the actor
 
-    def __hash__(self): #Returns hash value of this actor
-        texts = hash(self.name) + hash(self.description) + hash(self.room_name) #Sum of text sum
-        #Sum of all boolean values
-        bools = hash(self.collectable) + hash(self.accept_items) + hash(self.loose_grip)
-        items = sum(hash(x) for x in self.items) #Sum of all item hashes
-        attrs = sum(hash(x) for x in self.attributes) #Sum of all attribute hashes
-        #Sum of all of the use hashes
-        uses = sum(hash(x) for x in list(self.uses) + list(self.uses.values()))
-
-        #Return total hashes
-        return bools + texts * items + attrs - uses
-
     def use(self, item, engine):
         """Attempts to use this item on this actor."""
         if item in self.uses: #Perform the action associated
@@ -193,20 +359,14 @@ class Actor:
         """Item is some item in the game, action is a function taking self and the game engine."""
         self.uses[item] = action
 
-    def __eq__(self, other):
-        #If types differ, automatically NO
-        if type(self) != type(other): return False
-
-        #This item's information
-        self_info = (self.name, self.description, self.room_name, self.collectable,
-                     self.accept_items, self.loose_grip, self.items, self.attributes)
-
-        #Other item's information
-        other_info = (other.name, other.description, other.room_name, other.collectable,
-                      other.accept_items, other.loose_grip, other.items, other.attributes)
+    #Checked with the items of the room the actor is in (same as an item's events)
+    def check_events(self, game_engine):
+        return Item.check_events(self, game_engine)
 
-        #Return if these items are equal
-        return self_info == other_info
+    def make_fingerprint(self):
+        #What this actor is like, including the items they have
+        return hash((type(self).__name__, self.name, self.description, self.room_name, self.collectable,
+                     self.accept_items, self.loose_grip, tuple(self.attributes), self.items.fingerprint()))
 
     def __str__(self):
         return f"Actor(Name:{self.name}, R-Name:{self.room_name}, Attr:{self.attributes})"
@@ -216,12 +376,20 @@ class Actor:
 
 #The player object for the game
 class Player:
+    inventory = item_list_property('_inventory', 'inventory') #List of items owned
+    items = inventory #Same as the inventory
+
     def __init__(self, name="", description="", inventory=[]):
         self.name = name
         self.description = description
+        self.inventory_version = 0 #Goes up every time the inventory changes
         self.inventory = inventory #List of items owned
         self.collectable = False #The player cannot collect themself
 
+    def mark_changed(self, what):
+        """Notes the inventory has changed (rooms and items check this on their turn)."""
+        self.inventory_version += 1
+
     def tell_inventory(self): #Returns with text saying what the player has
         text = "I have: "
 
@@ -248,18 +416,33 @@ class Transistion:
     def __hash__(self): return 79
 
 #An exit in a room
-class Exit:
-    def __init__(self, room):
+class Exit(WorldObject):
+    changes = 0 #Times any exit has been locked or unlocked, for what is worked out from the locks
+
+    def __init__(self, room, origin=None):
+        self.uid = next(UIDS) #Identity of this exit
         self.room = room #The room connected to
+        self.origin = origin #The room this exit is in
         self.locked = False #If the room is locked or not
         self.key = None #The key we are looking for 
         self.uses = {} #Dict. of how items interact with this
 
-    def __hash__(self):
-        #Get the sum as the uses hash
-        uses_sum = sum(hash(x) for x in list(self.uses) + list(self.uses.values()))
-        #Return this hash by taking the sum of all of these parts
-        return hash(self.room) - hash(self.locked) + hash(self.key) - uses_sum
+    @property
+    def locked(self): return self._locked
+
+    @locked.setter
+    def locked(self, locked):
+        if getattr(self, '_locked', locked) != locked:
+            Exit.changes += 1
+
+        self._locked = locked
+
+        if type(self.origin).__name__ == 'Room': #Tell the room the exit changed
+            self.origin.mark_changed('locks')
+
+    def fingerprint(self):
+        """Hash of the state of this exit (the rooms and keys are only hashed by who they are)."""
+        return hash((self.locked, hash(self.key), hash(self.room)))
 
     def make_use(self, item, action):
         """Makes an antry on what this item does to this obj."""
@@ -278,10 +461,10 @@ class Exit:
         self.locked = True
         self.key = key
         #Setup key to change the state of the door
-        self.make_use(key, lambda self, engine: self.change_lock_state(key))
+        self.make_use(key, lambda self, engine: self.change_lock_state(key, engine))
 
-    #Changes the door to it's opposite state
-    def change_lock_state(self, key):
+    #Changes the door to it's opposite state (telling the user through the engine if given)
+    def change_lock_state(self, key, engine=None):
         #Change state of the exit
         if self.locked == False:
             state = self.lock(key)
@@ -289,11 +472,13 @@ class Exit:
         else:
             state = self.unlock(key)
 
+        output = print if engine == None else engine.output_text
+
         if state == 1: #Tell the user it worked
-            print("Success.")
+            output("Success.")
 
         elif state == -1: #Tell user it failed
-            print("Failed.")
+            output("Failed.")
 
     #Returns number, 1 = succesfful lock, 0 = was locked, -1 = unsuccessful lock
     def lock(self, test_key):
@@ -320,13 +505,74 @@ class Exit:
         #Otherwise, unseccessful
         else: return -1
 
-class Room:
+#Every direction an exit can go in. Each has a number, which is where it's exit goes in a
+#room's table of exits, and the direction that goes back the other way
+class DirectionRegistry:
+    def __init__(self):
+        self.names = [] #Number -> name of the direction
+        self.opposites = [] #Number -> number of the direction going back
+        self.numbers = {} #Name (or short name) of a direction -> number
+
+    def __len__(self): return len(self.names)
+
+    def add(self, name):
+        if name not in self.numbers:
+            self.numbers[name] = len(self.names)
+            self.names.append(name)
+            self.opposites.append(None)
+
+        return self.numbers[name]
+
+    def register(self, name, opposite=None, aliases=()):
+        """Adds a direction (and the direction going back, if it has one), aliases are
+        other names for it (like 'n' for 'north'). Gives back the direction's number."""
+        number = self.add(name.lower())
+
+        if opposite != None: #Each goes back the way of the other
+            back = self.add(opposite.lower())
+            self.opposites[number], self.opposites[back] = back, number
+
+        for alias in aliases:
+            self.numbers[alias.lower()] = number
+
+        return number
+
+    def number(self, direct):
+        """Gives back the number of a direction (by any of it's names), or none."""
+        number = self.numbers.get(direct)
+        return number if number != None else self.numbers.get(direct.lower())
+
+#The directions every game has, more can be added in the vocabulary (see Game.py)
+DIRECTIONS = DirectionRegistry()
+NORTH = DIRECTIONS.register('north', 'south', ['n'])
+SOUTH = DIRECTIONS.register('south', 'north', ['s'])
+EAST = DIRECTIONS.register('east', 'west', ['e'])
+WEST = DIRECTIONS.register('west', 'east', ['w'])
+
+#Makes a property for the exit of a room in this direction (room.north and so on)
+def exit_property(number):
+    def get_exit(self):
+        return self.get_exit(number)
+
+    def set_exit(self, exit):
+        self.set_exit(number, exit)
+
+    return property(get_exit, set_exit)
+
+class Room(WorldObject):
+    items = item_list_property('_items') #list of items in room
+    visited = changing_property('_visited', 'visited') #If this room has been visited
+    #All of the ajoined rooms (any direction can be reached with get_exit)
+    north = exit_property(NORTH)
+    south = exit_property(SOUTH)
+    east = exit_property(EAST)
+    west = exit_property(WEST)
+
     def __init__(self, name="", description="", room_start_text=""):
-        #All of the ajoined rooms
-        self.north = None
-        self.east = None
-        self.west = None
-        self.south = None
+        self.uid = next(UIDS) #Identity of this room
+        self.init_events() #List of events and things to do
+        #Exit in each direction, by the direction's number
+        self.exits = [None] * len(DIRECTIONS)
         self.visited = False #If this room has been visited
         self.start_text_shown = False #If startup text is shown
         self.player_here = False #If the player is currently here
@@ -337,20 +583,17 @@ class Room:
         self.room_start_text = room_start_text
 
         self.items = [] #list of items in room
-        self.events = [] #List of events and things to do
 
-    def __hash__(self): #Returns hash of this value
-        #Sum of all direction nodes
-        dirs = hash(self.north) + hash(self.south) + hash(self.east) + hash(self.west)
-        #Sym of all text hashes
-        texts = hash(self.name) + hash(self.description) + hash(self.room_start_text)
-        item_sum = sum(hash(x) for x in self.items) #Sum of items
-        event_sum = sum(hash(x) for x in self.events) #Sum of events
-        #Sum of the rest of the values
-        rest = hash(self.visited) + hash(self.start_text_shown) + hash(self.player_here)
+    def make_fingerprint(self):
+        return hash((self.name, self.description, self.room_start_text, self.visited,
+                     self.start_text_shown, self.player_here, self.items.fingerprint()))
 
-        #return hashed values
-        return dirs - texts + item_sum - event_sum * rest
+    def fingerprint(self):
+        """Hash of what this room is like, and it's state. The exits (only a few, so they
+        are hashed every time) only hash the rooms they lead to by who they are, so it
+        never goes through the rest of the map."""
+        exits = tuple(None if x == None else x.fingerprint() for x in self.exits)
+        return hash((WorldObject.fingerprint(self), exits))
 
     def get_description(self): #Returns discription + room description of objects
         text = ""
@@ -377,56 +620,61 @@ class Room:
 
     #Adds an event to the list of events to check
     #(an event is just a function to call)
-    def make_event(self, cond, event):
+    def make_event(self, cond, event, depends=None):
         """
         An event is something that occurs based on some certain condition
         in a room. An event has a CONDITION, and an EVENT (action).
         The CONDITION is a function (that only takes self) and returns 
         a Boolean (true if the event will occur, false otherwise). The
         EVENT is the function that takes only self and preforms some action.
+        DEPENDS is a list of what the condition looks at (from EVENT_DEPENDS),
+        if given, the condition is only checked after one of those changes.
         """
         event.__doc__ = cond 
-        self.events.append(event)
+        self.subscribe(event, depends)
 
     #Check if any events have happened et
     def check_events(self, game_engine):
-        """Checks if any events are ready to be triggered."""
+        """Checks if any events are ready to be triggered, gives back how many
+        conditions were checked."""
+        events = self.due_events(game_engine.player)
+
         #If the vent is true, then we will execute the event
-        for event in self.events:
+        for event in events:
             if event.__doc__(self) == True:
                 event(self)
 
+        checked = len(events)
+
         #Check the evnts of every item
         for item in self.items:
-            item.check_events(game_engine)
+            checked += item.check_events(game_engine)
+
+        return checked
+
+    def get_exit(self, number):
+        """Gives back the exit in the direction with this number (none if there isn't one)."""
+        return self.exits[number] if number < len(self.exits) else None
 
-    #Gives cardinal direction
-    def __simple_dir(self, direct):
-        if direct.lower() in ['west', 'w']: return 'west'
-        elif direct.lower() in ['south', 's']: return 'south'
-        elif direct.lower() in ['east', 'e']: return 'east'
-        elif direct.lower() in ['north', 'n']: return 'north'
+    def set_exit(self, number, exit):
+        if number >= len(self.exits): #Direction added after this room was made
+            self.exits = self.exits + [None] * (len(DIRECTIONS) - len(self.exits))
+
+        self.exits[number] = exit
 
     #Makes a connection to this new node that is given
     def make_connect(self, direct, node):
-        """Makes a connection to another room via some cardinal direction."""
-        direct = self.__simple_dir(direct) #Get the direction
-
-        if direct == 'north':
-            self.north = Exit(node) #North of this room is the new room
-            self.north.room.south = Exit(self) #Allow for backtracking
+        """Makes a connection to another room via some direction (the name, or a short name)."""
+        number = DIRECTIONS.number(direct) #Get the direction
 
-        elif direct == 'south':
-            self.south = Exit(node)
-            self.south.room.north = Exit(self)
+        if number == None: #Not a direction
+            return
 
-        elif direct == 'east':
-            self.east = Exit(node)
-            self.east.room.west = Exit(self)
+        self.set_exit(number, Exit(node, self)) #This way is the new room
+        back = DIRECTIONS.opposites[number]
 
-        elif direct == 'west':
-            self.west = Exit(node)
-            self.west.room.east = Exit(self)
+        if back != None and type(node).__name__ == 'Room': #Allow for backtracking
+            node.set_exit(back, Exit(self, node))
 
     #Adds the items to the list of items in this room
     def add_items(self, *items):
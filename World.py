@@ -0,0 +1,105 @@
+"""
+Copy-on-write instances of a world. The maps made for a game are
+used as a template, and every player gets an instance made of views
+of the template's rooms, exits and items. A view reads everything it
+hasn't changed from the template (names, descriptions, how the rooms
+connect, uses and events), and only keeps what it changes itself
+(flags, items held, locks), so making a new instance is cheap and
+costs about as much as what that player changes.
+Date: 10/18/26
+"""
+from Tools import WorldObject, ItemList, Player
+
+#Read straight from the template and never copied, since playing the game doesn't change them
+SHARED = ['uses', 'events', 'polled', 'subscribers']
+
+#Stands in for an object in the template. It has the same uid (so it's equal to, and
+#found in lists the same as, the template object), and the same type name and methods
+class WorldView:
+    def __getattr__(self, attr):
+        #Only called when this view doesn't have attr itself, so read the template
+        #(the fingerprint, and where an item is, are never the template's)
+        if attr.startswith('__') or attr in ['_template', '_instance', '_fingerprint', '_holder']:
+            raise AttributeError(attr)
+
+        value = getattr(self._template, attr)
+
+        if isinstance(value, WorldObject): #Use our view of it instead
+            return self._instance.view(value)
+
+        elif type(value).__name__ == 'ItemList': #Our own list, of views of the items
+            value = ItemList([self._instance.view(x) for x in value], self, value.what)
+
+        elif type(value).__name__ == 'list' and attr not in SHARED: #Copied, with views in it
+            value = [self._instance.view(x) if isinstance(x, WorldObject) else x for x in value]
+
+        elif type(value).__name__ in ['dict', 'set'] and attr not in SHARED:
+            value = type(value)(value) #Copied, since it may be changed in place
+
+        else: #Anything else can't change under us
+            return value
+
+        self.__dict__[attr] = value
+        return value
+
+    def unshare(self, *attrs):
+        """Gives this view it's own copy of shared values, before they are changed."""
+        for attr in attrs:
+            if attr not in self.__dict__:
+                value = getattr(self._template, attr)
+
+                if type(value).__name__ == 'dict': #Subscribers are a dict of lists
+                    value = {key: list(x) if type(x).__name__ == 'list' else x for key, x in value.items()}
+
+                self.__dict__[attr] = type(value)(value)
+
+    def subscribe(self, event, depends):
+        self.unshare('events', 'polled', 'subscribers')
+        super().subscribe(event, depends)
+
+    def make_use(self, item, action):
+        self.unshare('uses')
+        super().make_use(item, action)
+
+    def changes(self):
+        """Gives back what this view has changed (or copied) from the template."""
+        return {attr: value for attr, value in self.__dict__.items()
+                if attr not in ['uid', '_template', '_instance', '_fingerprint', '_holder']}
+
+#View classes for each template class, with the same name (the engine goes by the type name)
+VIEW_CLASSES = {}
+
+def view_class(cls):
+    if cls not in VIEW_CLASSES:
+        VIEW_CLASSES[cls] = type(cls.__name__, (WorldView, cls), {'__module__': cls.__module__})
+
+    return VIEW_CLASSES[cls]
+
+#One player's copy of a world, made of views that are only made once they're reached
+class WorldInstance:
+    def __init__(self, maps):
+        self.views = {} #uid -> view of that template object
+        #Transistions and ends have nothing to change, so they're shared
+        self.maps = [self.view(graph) if isinstance(graph, WorldObject) else graph for graph in maps]
+
+    def view(self, obj):
+        """Gives back the view of this template object in this instance."""
+        if isinstance(obj, WorldView): #Already a view
+            return obj
+
+        view = self.views.get(obj.uid)
+
+        if view == None: #First time it's been reached, made without running __init__
+            view = object.__new__(view_class(type(obj)))
+            view.__dict__.update(uid=obj.uid, _template=obj, _instance=self)
+            self.views[obj.uid] = view
+
+        return view
+
+    def player(self, player):
+        """A new player like this one, holding views of their items."""
+        return Player(player.name, player.description, [self.view(item) for item in player.inventory])
+
+    def changes(self):
+        """Gives back how many values every view has changed or copied from the template."""
+        return sum(len(view.changes()) for view in self.views.values())
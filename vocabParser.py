@@ -5,6 +5,12 @@ for text based adventure games.
 Author: Alastar Slater
 Date: 3/10/19
 """
+import marshal
+import tempfile
+import hashlib
+import re
+import os
+
 EOF    = "EOF" #End of file tag
 WORD   = "WORD" #A word in this language
 START   = "START" #Info tag for what information is given
@@ -168,9 +174,105 @@ class Lexer:
         return toks + [self.get_next_token()]
 
 
-class Parser: #Parses it into a dictionary
+#Characters that can start a word, and then be in the rest of it (the same characters
+#the Lexer accepts, which goes by the lowercase version, so includes the Kelvin sign)
+WORD_START = "abdegijklmnoprstxABDEGIJKLMNOPRSTX\u212a"
+WORD_REST = WORD_START + "!"
+
+#One pattern for every kind of token, the first character decides which one it is
+TOKEN_PATTERN = re.compile(r"""
+     (?P<SKIP>(?:\s+|\#[^\n]*\n?)+)   #Whitespace and comments
+    |(?P<COLON>:)
+    |(?P<STRING>"(?P<VALUE>[^"]*)"?)    #Runs to the end if it isn't closed
+    |(?P<COMMA>,)
+    |(?P<SEMI>;)
+    |(?P<EQUAL>=)
+    |(?P<WORD>[{}][{}]*)
+""".format(WORD_START, WORD_REST), re.VERBOSE)
+
+#Lexer that goes over the whole program in one pass of a compiled regular expression,
+#gives back exactly the same tokens as the Lexer (including line and column)
+class ScanLexer:
     def __init__(self, program):
-        self.lexer = Lexer(program) #tokenize program
+        self.text = program
+        self.line = 1 #Line and column of the last character looked at
+        self.column = 1
+        self.tokens = self.scan() #Tokens are made as they're asked for
+
+    def unrecognized_char(self, char):
+        print("Unrecognized char: {}".format(char))
+        print("Refer to line: {}, Column: {}".format(self.line, self.column))
+        raise SystemExit
+
+    def scan(self):
+        text = self.text
+        pos = 0 #Where the next token should start
+        line = 1
+        #Columns count from the last new line (a new line is column 0 of the
+        #next line), the first character never counts as a new line
+        base = -1
+
+        for match in TOKEN_PATTERN.finditer(text):
+            start, end = match.span()
+
+            if start != pos: #Skipped over an unrecognized character
+                break
+
+            pos = end
+            kind = match.lastgroup
+
+            if kind == 'WORD':
+                word = match.group()
+
+                #If a command (meaning, in FULL CAPS), return it as a command
+                yield Token(word if word in COMMANDS else WORD, word, line, start - base)
+                continue
+
+            elif kind == 'STRING': #Give back what's inside the quotes
+                yield Token(STRING, match.group('VALUE'), line, start - base)
+
+            elif kind != 'SKIP': #Punctuation
+                yield Token(kind, kind, line, start - base)
+                continue
+
+            #Only whitespace, comments and strings can have new lines in them
+            newlines = text.count('\n', start or 1, end)
+
+            if newlines > 0:
+                line += newlines
+                base = text.rfind('\n', start or 1, end)
+
+        self.line = line
+
+        if pos < len(text): #Uncrecognized character
+            self.column = pos - base
+            self.unrecognized_char(text[pos])
+
+        #The end is located at the last character
+        self.column = max(len(text) - 1, 0) - base
+
+        while True: #Keep giving back the end of the file
+            yield Token(EOF, EOF, self.line, self.column)
+
+    def get_next_token(self):
+        return next(self.tokens)
+
+    def get_tokens(self):
+        toks = []
+
+        for tok in self.tokens: #Collect tokens until the end of file
+            if tok.type == EOF:
+                break
+
+            toks.append(tok)
+
+        #Returns full list of tokens
+        return toks + [self.get_next_token()]
+
+
+class Parser: #Parses it into a dictionary
+    def __init__(self, program, lexer=ScanLexer):
+        self.lexer = lexer(program) #tokenize program
         self.current_token = self.lexer.get_next_token() #Get token
         self.line = self.current_token.line
         self.column = self.current_token.column
@@ -201,12 +303,18 @@ class Parser: #Parses it into a dictionary
         """
         ret = {} #Return dictionary
 
-        #Combine result with result of the statement
-        while self.current_token.type != EOF:
-            ret = {**ret, **self.statement()}
+        #Add in every field as soon as it's parsed
+        for name, value in self.fields():
+            ret[name] = value
 
         return ret #return the program
 
+    def fields(self):
+        """Gives back (name, value) pairs of every statement as soon as it's parsed,
+        (field_name, entries) for a field and (name, word) for a variable."""
+        while self.current_token.type != EOF:
+            yield from self.statement().items()
+
     def statement(self):
         """
         statement: variable_declr
@@ -309,3 +417,76 @@ def read_vocab(file_name):
 
     else: #Otherwise, return the parsed file
         return Parser(contents).parse()
+
+#Reads a vocabulary file one statement at a time, giving back the (name, value) pairs
+def iter_vocab(file_name):
+    try:
+        #Try to read the file
+        contents = open(file_name, 'r').read()
+
+    except FileNotFoundError:
+        print("--Couldn't locate file {} in current directory--".format(file_name))
+        raise SystemExit
+
+    return Parser(contents).fields()
+
+#Version of the compiled vocabulary files, change if their layout changes
+CACHE_VERSION = 1
+
+#Reads a vocabulary file, using the compiled version of it saved next to it when
+#it's still up to date (so the file doesn't need to be lexed and parsed again)
+def load_vocab(file_name):
+    cache_name = file_name + '.cache' #Where the compiled version is saved
+
+    try: #Find out when the vocabulary last changed
+        stat = os.stat(file_name)
+
+    except FileNotFoundError:
+        print("--Couldn't locate file {}--".format(file_name))
+        raise SystemExit
+
+    try: #Try to load the compiled vocabulary
+        with open(cache_name, 'rb') as f:
+            cache = marshal.load(f)
+
+    except (OSError, EOFError, ValueError, TypeError):
+        cache = None
+
+    #Should be the right version with the same vocabulary file
+    if type(cache) == dict and cache.get('version') == CACHE_VERSION:
+        #Same time and size, it's up to date
+        if cache['mtime'] == stat.st_mtime_ns and cache['size'] == stat.st_size:
+            return cache['vocab']
+
+    contents = open(file_name, 'rb').read()
+    digest = hashlib.sha1(contents).hexdigest() #Hash of the vocabulary
+
+    #Only the time changed (such as a fresh checkout), contents are the same
+    if type(cache) == dict and cache.get('version') == CACHE_VERSION and cache['hash'] == digest:
+        vocab = cache['vocab']
+
+    else: #Otherwise, parse the vocabulary file again
+        vocab = read_vocab(file_name)
+
+    #Save the compiled vocabulary for next time
+    save_vocab_cache(cache_name, {'version': CACHE_VERSION, 'mtime': stat.st_mtime_ns,
+                                  'size': stat.st_size, 'hash': digest, 'vocab': vocab})
+
+    return vocab
+
+#Writes out the compiled vocabulary, if it can't be written it'll just be parsed next time
+def save_vocab_cache(cache_name, cache):
+    temp_name = None
+
+    try: #Write to a temporary file of our own first, so a half written cache is never read
+        folder, name = os.path.split(os.path.abspath(cache_name))
+
+        with tempfile.NamedTemporaryFile('wb', dir=folder, prefix=name + '.', suffix='.tmp', delete=False) as f:
+            temp_name = f.name
+            marshal.dump(cache, f)
+
+        os.replace(temp_name, cache_name)
+
+    except OSError:
+        if temp_name != None and os.path.exists(temp_name): #Don't leave it behind
+            os.remove(temp_name)
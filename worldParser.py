@@ -0,0 +1,620 @@
+"""
+Parser for a minilang for making worlds (rooms, items, containers,
+actors, how the rooms connect, locks and simple events) as files of
+data instead of python, in the same style as the vocabulary files.
+A world file is compiled into plain lists and strings, saved with
+marshal next to it (or shipped on it's own), so loading a world never
+runs any code from the file and never has to parse it again.
+
+    #Objects are made in blocks, with a name to refer to them by
+    START ROOM hallway:
+        name: "hallway", description: "A narrow hallway.",
+        items: [box]
+    END
+
+    START CONTAINER box:
+        name: "item", description: "A small box.", "room name": "item",
+        collectable: FALSE
+    END
+
+    CONNECT bedroom north hallway;      #Both ways, like make_connect
+    CONNECT hallway west TRANSISTION;   #Way to the next map
+    LOCK hallway west;                  #Locked (WITH some key, if a key opens it)
+    WHEN box HOLDS words UNLOCK hallway west;
+    MAP bedroom;                        #Maps are played in the order given
+    MAP END "The end.";
+
+Date: 10/18/26
+"""
+from vocabParser import Token, save_vocab_cache
+from Tools import Room, Item, Container, Actor, Exit, ItemList, Player, Transistion, End, DIRECTIONS, UIDS
+from World import WorldView
+import marshal
+import hashlib
+import re
+import os
+
+EOF    = "EOF" #End of file tag
+NAME   = "NAME" #Name of an object, field or direction
+STRING = "STRING" #Text, such as descriptions
+COLON  = "COLON"
+COMMA  = "COMMA"
+SEMI   = "SEMI" #Ends every statement that isn't a block
+LBRACK = "LBRACK" #Start and end of a list
+RBRACK = "RBRACK"
+
+#All of the commands for this language (everything else in capitals is a name)
+COMMANDS = ["START", "END", "ROOM", "ITEM", "CONTAINER", "ACTOR", "PLAYER", "CONNECT", "LOCK",
+            "WITH", "WHEN", "HOLDS", "VISITED", "UNLOCK", "SAY", "DESCRIBE", "MAP",
+            "TRANSISTION", "TRUE", "FALSE"]
+
+#The fields of every kind of block, in the order they are compiled, with their defaults
+FIELDS = {
+    'ROOM': [('name', ""), ('description', ""), ('start text', ""), ('items', [])],
+    'ITEM': [('name', ""), ('description', ""), ('attributes', []), ('room name', ""), ('collectable', True)],
+    'CONTAINER': [('name', ""), ('description', ""), ('attributes', []), ('room name', ""),
+                  ('collectable', True), ('open', True), ('items', [])],
+    'ACTOR': [('name', ""), ('description', ""), ('attributes', []), ('room name', ""),
+              ('accept items', True), ('loose grip', True), ('items', [])],
+    'PLAYER': [('name', ""), ('description', ""), ('items', [])],
+}
+
+#One pattern for every kind of token, the first character decides which one it is
+TOKEN_PATTERN = re.compile(r"""
+     (?P<SKIP>(?:\s+|\#[^\n]*\n?)+)   #Whitespace and comments
+    |(?P<COLON>:)
+    |(?P<STRING>"(?P<VALUE>[^"]*)")
+    |(?P<COMMA>,)
+    |(?P<SEMI>;)
+    |(?P<LBRACK>\[)
+    |(?P<RBRACK>\])
+    |(?P<NAME>[A-Za-z_][A-Za-z0-9_]*)
+""", re.VERBOSE)
+
+class Lexer:
+    def __init__(self, program):
+        self.text = program
+        self.tokens = self.scan()
+
+    def scan(self):
+        line, base, pos = 1, -1, 0 #Base is where the line started, pos where the next token should
+
+        for match in TOKEN_PATTERN.finditer(self.text):
+            start, end = match.span()
+
+            if start != pos: #Skipped over an unrecognized character
+                break
+
+            pos = end
+            kind = match.lastgroup
+
+            if kind == 'NAME':
+                word = match.group()
+                yield Token(word if word in COMMANDS else NAME, word, line, start - base)
+
+            elif kind == 'STRING':
+                yield Token(STRING, match.group('VALUE'), line, start - base)
+
+            elif kind != 'SKIP': #Punctuation
+                yield Token(kind, kind, line, start - base)
+
+            #Only whitespace, comments and strings can have new lines in them
+            if kind in ['SKIP', 'STRING'] and '\n' in match.group():
+                line += match.group().count('\n')
+                base = self.text.rfind('\n', start, end)
+
+        if pos < len(self.text): #Unrecognized character
+            print("Unrecognized char: {}".format(self.text[pos]))
+            print("Refer to line: {}, Column: {}".format(line, pos - base))
+            raise SystemExit
+
+        while True: #Keep giving back the end of the file
+            yield Token(EOF, EOF, line, pos - base)
+
+    def get_next_token(self):
+        return next(self.tokens)
+
+class Parser: #Parses a world into statements
+    def __init__(self, program, lexer=Lexer):
+        self.lexer = lexer(program)
+        self.current_token = self.lexer.get_next_token()
+
+    def error(self, err):
+        print(err)
+        print("Refer to Line: {}, Column: {}".format(self.current_token.line, self.current_token.column))
+        raise SystemExit
+
+    def eat(self, tok_type, err='default'):
+        """Gives back the value of the current token (and moves on) if it's of this type."""
+        token = self.current_token
+
+        if tok_type != token.type: #Raise an error
+            if err == 'default':
+                err = "An error occured, expected token of type: {}\nInstead, got type: {}".format(tok_type, token.type)
+
+            self.error(err)
+
+        self.current_token = self.lexer.get_next_token()
+        return token.value
+
+    def parse(self):
+        """
+        program: statement*
+        """
+        statements = []
+
+        while self.current_token.type != EOF:
+            statements.append(self.statement())
+
+        return statements
+
+    def statement(self):
+        """
+        statement: block | connect | lock | event | map
+        """
+        tok_type = self.current_token.type
+        line = self.current_token.line #Kept, so the compiler can point out mistakes
+
+        if tok_type == 'START':
+            return (line,) + self.block()
+
+        elif tok_type == 'CONNECT':
+            #connect: CONNECT NAME NAME (NAME | TRANSISTION) ';'
+            self.eat('CONNECT')
+            room, direct = self.eat(NAME, "Syntax Error: Expected a ROOM to connect from"), self.eat(NAME)
+
+            if self.current_token.type == 'TRANSISTION':
+                target = self.eat('TRANSISTION')
+
+            else:
+                target = self.eat(NAME, "Syntax Error: Expected a ROOM (or TRANSISTION) to connect to")
+
+            self.eat(SEMI, "Syntax Error: Expected a semi colon to end the connection")
+            return (line, 'CONNECT', room, direct, target)
+
+        elif tok_type == 'LOCK':
+            #lock: LOCK NAME NAME (WITH NAME)? ';'
+            self.eat('LOCK')
+            room, direct, key = self.eat(NAME, "Syntax Error: Expected a ROOM to lock the exit of"), self.eat(NAME), None
+
+            if self.current_token.type == 'WITH':
+                self.eat('WITH')
+                key = self.eat(NAME, "Syntax Error: Expected an ITEM as the key")
+
+            self.eat(SEMI, "Syntax Error: Expected a semi colon to end the lock")
+            return (line, 'LOCK', room, direct, key)
+
+        elif tok_type == 'WHEN':
+            return (line,) + self.event()
+
+        elif tok_type == 'MAP':
+            #map: MAP (NAME | END STRING) ';'
+            self.eat('MAP')
+
+            if self.current_token.type == 'END':
+                self.eat('END')
+                target = ('END', self.eat(STRING, "Syntax Error: Expected the text of the end"))
+
+            else:
+                target = ('ROOM', self.eat(NAME, "Syntax Error: Expected the ROOM the map starts in"))
+
+            self.eat(SEMI, "Syntax Error: Expected a semi colon to end the map")
+            return (line, 'MAP') + target
+
+        self.error("Syntax Error: UNKNOWN STATMENT\nExpected a block, CONNECT, LOCK, WHEN or MAP at this time.")
+
+    def block(self):
+        """
+        block: START kind NAME? ':' (field (',' field)*)? END
+        field: (NAME | STRING) ':' value
+        """
+        self.eat('START')
+        kind = self.current_token.type
+
+        if kind not in FIELDS:
+            self.error("Syntax Error: Expected what kind of object this is ({})".format(", ".join(FIELDS)))
+
+        self.eat(kind)
+        name = self.eat(NAME, "Syntax Error: Expected the name of this object") if kind != 'PLAYER' else 'player'
+        self.eat(COLON, "Syntax Error: Expected a colon (':') to note the start of the fields")
+        fields = {}
+
+        while self.current_token.type != 'END':
+            if len(fields) > 0:
+                self.eat(COMMA, "Syntax Error: Expected a COMMA between fields, or END")
+
+            field = self.current_token.value
+            self.eat(STRING if self.current_token.type == STRING else NAME, "Syntax Error: Expected the name of a field")
+            self.eat(COLON, "Syntax Error: Expected a COLON to seperate the field and it's value")
+            fields[field] = self.value()
+
+        self.eat('END')
+        return (kind, name, fields)
+
+    def value(self):
+        """
+        value: STRING | NAME | TRUE | FALSE | '[' (value (',' value)*)? ']'
+        """
+        tok_type = self.current_token.type
+
+        if tok_type in [STRING, NAME]:
+            return self.eat(tok_type)
+
+        elif tok_type in ['TRUE', 'FALSE']:
+            return self.eat(tok_type) == 'TRUE'
+
+        values = []
+        self.eat(LBRACK, "Syntax Error: Expected a STRING, NAME, TRUE, FALSE or a list")
+
+        while self.current_token.type != RBRACK:
+            if len(values) > 0:
+                self.eat(COMMA, "Syntax Error: Expected a COMMA between values in the list")
+
+            values.append(self.value())
+
+        self.eat(RBRACK)
+        return values
+
+    def event(self):
+        """
+        event: WHEN NAME (HOLDS NAME | VISITED) action ';'
+        action: UNLOCK NAME NAME | LOCK NAME NAME | DESCRIBE NAME STRING | SAY STRING
+        """
+        self.eat('WHEN')
+        holder = self.eat(NAME, "Syntax Error: Expected the object the event is on")
+
+        if self.current_token.type == 'HOLDS':
+            self.eat('HOLDS')
+            condition = ('HOLDS', self.eat(NAME, "Syntax Error: Expected the ITEM it holds"))
+
+        else:
+            self.eat('VISITED', "Syntax Error: Expected HOLDS or VISITED as the condition")
+            condition = ('VISITED', None)
+
+        action = self.current_token.type
+
+        if action in ['UNLOCK', 'LOCK']:
+            self.eat(action)
+            arguments = (self.eat(NAME, "Syntax Error: Expected the ROOM the exit is in"), self.eat(NAME))
+
+        elif action == 'DESCRIBE':
+            self.eat(action)
+            arguments = (self.eat(NAME, "Syntax Error: Expected the object to describe"), self.eat(STRING))
+
+        else:
+            self.eat('SAY', "Syntax Error: Expected UNLOCK, LOCK, DESCRIBE or SAY as what happens")
+            arguments = (self.eat(STRING, "Syntax Error: Expected the text to say"),)
+
+        self.eat(SEMI, "Syntax Error: Expected a semi colon to end the event")
+        return ('WHEN', holder) + condition + (action, arguments)
+
+#Version of the compiled world files, change if their layout changes
+WORLD_VERSION = 1
+
+#Tells the user about a mistake in the world, and stops
+def world_error(line, err):
+    print(err)
+    print("Refer to Line: {}".format(line))
+    raise SystemExit
+
+def compile_world(statements):
+    """Turns the statements of a world into plain lists of strings and numbers (objects are
+    numbered, in the order they were made) that can be saved with marshal."""
+    numbers, kinds = {}, {} #Name of an object -> it's number, and it's kind
+    world = {'version': WORLD_VERSION, 'objects': [], 'items': [], 'connections': [],
+             'locks': [], 'events': [], 'player': None, 'maps': []}
+
+    #Number every object first, so they can be referred to before they're made
+    for statement in statements:
+        if statement[1] in FIELDS and statement[1] != 'PLAYER':
+            line, kind, name = statement[:3]
+
+            if name in numbers:
+                world_error(line, "Name Error: There is already an object named '{}'".format(name))
+
+            numbers[name], kinds[name] = len(numbers), kind
+
+    def number(line, name, *allowed):
+        if name not in numbers or (len(allowed) > 0 and kinds[name] not in allowed):
+            world_error(line, "Name Error: There is no {} named '{}'".format(" or ".join(allowed) or 'object', name))
+
+        return numbers[name]
+
+    def direction(line, name):
+        if DIRECTIONS.number(name) == None:
+            world_error(line, "Name Error: There is no direction '{}', pick from: {}".format(name, ", ".join(DIRECTIONS.names)))
+
+        return DIRECTIONS.names[DIRECTIONS.number(name)]
+
+    exits = set() #(Number of a room, direction) of every exit made, both ways (like make_connect)
+    uses = [] #(Line, number of a room, direction) of the exits locked, or changed by events
+
+    for statement in statements:
+        line, kind = statement[:2]
+
+        if kind in FIELDS: #An object, with every field in order
+            name, fields = statement[2:]
+            unknown = [x for x in fields if x not in [field for field, default in FIELDS[kind]]]
+
+            if len(unknown) > 0:
+                world_error(line, "Name Error: {} has no field '{}'".format(kind, unknown[0]))
+
+            values = [fields.get(field, default) for field, default in FIELDS[kind]]
+            values = [tuple(x) if type(x).__name__ == 'list' else x for x in values]
+
+            if kind == 'PLAYER':
+                world['player'] = (values[0], values[1], tuple(number(line, x, 'ITEM', 'CONTAINER') for x in values[2]))
+                continue
+
+            if 'items' in [field for field, default in FIELDS[kind]]: #Held items are numbered, and given after
+                if len(values[-1]) > 0:
+                    world['items'].append((numbers[name], tuple(number(line, x, 'ITEM', 'CONTAINER', 'ACTOR') for x in values[-1])))
+
+                values = values[:-1]
+
+            world['objects'].append((kind,) + tuple(values))
+
+        elif kind == 'CONNECT':
+            room, direct, target = number(line, statement[2], 'ROOM'), direction(line, statement[3]), statement[4]
+            target = -1 if target == 'TRANSISTION' else number(line, target, 'ROOM')
+            world['connections'].append((room, direct, target))
+            exits.add((room, direct))
+            back = DIRECTIONS.opposites[DIRECTIONS.number(direct)]
+
+            if target != -1 and back != None: #The way back
+                exits.add((target, DIRECTIONS.names[back]))
+
+        elif kind == 'LOCK':
+            room, direct, key = statement[2:]
+            key = -1 if key == None else number(line, key, 'ITEM', 'CONTAINER')
+            world['locks'].append((number(line, room, 'ROOM'), direction(line, direct), key))
+            uses.append((line,) + world['locks'][-1][:2])
+
+        elif kind == 'WHEN':
+            name, condition, held, action, arguments = statement[2:]
+            holder = number(line, name, 'ROOM', 'CONTAINER', 'ACTOR') if condition == 'HOLDS' else number(line, name, 'ROOM')
+            held = -1 if held == None else number(line, held, 'ITEM', 'CONTAINER', 'ACTOR')
+
+            if action in ['UNLOCK', 'LOCK']:
+                arguments = (number(line, arguments[0], 'ROOM'), direction(line, arguments[1]))
+                uses.append((line,) + arguments)
+
+            elif action == 'DESCRIBE':
+                arguments = (number(line, arguments[0]), arguments[1])
+
+            elif kinds[name] == 'ROOM': #Room events aren't given the game to say things with
+                world_error(line, "Syntax Error: Only items, containers and actors can SAY things")
+
+            world['events'].append((holder, condition, held, action, arguments))
+
+        elif kind == 'MAP':
+            target = statement[3]
+            world['maps'].append(target if statement[2] == 'END' else number(line, target, 'ROOM'))
+
+    #Checked once every exit is made, since they can be connected after they're locked
+    names = {number: name for name, number in numbers.items()}
+
+    for line, room, direct in uses:
+        if (room, direct) not in exits:
+            world_error(line, "Name Error: There is no exit {} of '{}', CONNECT it first".format(direct, names[room]))
+
+    return share_strings(world, {})
+
+#Makes every string that's the same the same object, so marshal only saves it once
+#(and loading it only makes it once)
+def share_strings(value, strings):
+    type_name = type(value).__name__
+
+    if type_name == 'str':
+        return strings.setdefault(value, value)
+
+    elif type_name in ['tuple', 'list']:
+        return type(value)(share_strings(x, strings) for x in value)
+
+    elif type_name == 'dict':
+        return {key: share_strings(x, strings) for key, x in value.items()}
+
+    return value
+
+def read_world(file_name):
+    """Reads a world file, and gives back the compiled world."""
+    try: #Try to read the file
+        contents = open(file_name, 'r').read()
+
+    except FileNotFoundError:
+        print("--Couldn't locate file {}--".format(file_name))
+        raise SystemExit
+
+    return compile_world(Parser(contents).parse())
+
+def save_world(world, file_name):
+    """Saves a compiled world to it's own file, which can be shipped without the world file."""
+    with open(file_name, 'wb') as f:
+        marshal.dump(world, f)
+
+#Reads a world file, using the compiled version of it saved next to it when it's still
+#up to date (the same as load_vocab). Compiled worlds (.worldc) are read as they are
+def load_world_data(file_name):
+    if file_name.endswith('.worldc'):
+        with open(file_name, 'rb') as f:
+            world = marshal.loads(f.read()) #Much quicker than reading it bit by bit
+
+        if type(world) != dict or world.get('version') != WORLD_VERSION:
+            print("--{} was compiled for a different version of the game--".format(file_name))
+            raise SystemExit
+
+        return world
+
+    cache_name = file_name + '.cache' #Where the compiled version is saved
+
+    try: #Find out when the world last changed
+        stat = os.stat(file_name)
+
+    except FileNotFoundError:
+        print("--Couldn't locate file {}--".format(file_name))
+        raise SystemExit
+
+    try: #Try to load the compiled world
+        with open(cache_name, 'rb') as f:
+            cache = marshal.loads(f.read())
+
+    except (OSError, EOFError, ValueError, TypeError):
+        cache = None
+
+    if type(cache) == dict and cache.get('version') == WORLD_VERSION:
+        #Same time and size, it's up to date
+        if cache['mtime'] == stat.st_mtime_ns and cache['size'] == stat.st_size:
+            return cache['world']
+
+    contents = open(file_name, 'rb').read()
+    digest = hashlib.sha1(contents).hexdigest() #Hash of the world
+
+    #Only the time changed (such as a fresh checkout), contents are the same
+    if type(cache) == dict and cache.get('version') == WORLD_VERSION and cache['hash'] == digest:
+        world = cache['world']
+
+    else: #Otherwise, parse the world file again
+        world = read_world(file_name)
+
+    save_vocab_cache(cache_name, {'version': WORLD_VERSION, 'mtime': stat.st_mtime_ns,
+                                  'size': stat.st_size, 'hash': digest, 'world': world})
+
+    return world
+
+#Gives back the object in the same world as the object an event is on (the view of it,
+#if the event is on a view in an instance of the world)
+def same_world(holder, obj):
+    return holder._instance.view(obj) if isinstance(holder, WorldView) else obj
+
+#Makes the event for a compiled event, out of the objects made
+def make_event(objects, condition, held, action, arguments):
+    if condition == 'HOLDS':
+        held = objects[held]
+        cond = lambda self: held in self.items
+
+    else:
+        cond = lambda self: self.visited == True
+
+    if action in ['UNLOCK', 'LOCK']:
+        room, number, locked = objects[arguments[0]], DIRECTIONS.number(arguments[1]), action == 'LOCK'
+
+        def event(self, engine=None): #(Every exit locked is made, see compile_world)
+            same_world(self, room).get_exit(number).locked = locked
+
+    elif action == 'DESCRIBE':
+        obj, text = objects[arguments[0]], arguments[1]
+
+        def event(self, engine=None):
+            same_world(self, obj).description = text
+
+    else: #Say something
+        text = arguments[0]
+
+        def event(self, engine=None):
+            engine.output_text(text)
+
+    event.__doc__ = cond #Condition is kept as the doc-string (same as make_event)
+    return event
+
+#Makes an object of this class with these fields, without running it's __init__ (the same
+#as WorldInstance.view does), since the setters tell the object about every change made to
+#it and nothing can be watching a new object yet. It has a new uid, and no events
+def new_object(cls, **fields):
+    obj = object.__new__(cls)
+    obj.__dict__.update(uid=next(UIDS), events=[], polled={}, subscribers={}, pending={}, inventory_seen=None)
+    obj.__dict__.update(fields)
+    return obj
+
+#Makes a new exit to the room, in the origin room (unlocked, same as Exit.__init__)
+def new_exit(room, origin):
+    exit = object.__new__(Exit)
+    exit.__dict__.update(uid=next(UIDS), room=room, origin=origin, _locked=False, key=None, uses={})
+    return exit
+
+def build_world(world):
+    """Makes the objects of a compiled world, gives back the maps (in order) and the player."""
+    held = dict(world['items']) #Number of an object -> numbers of the items it holds
+    objects = []
+
+    #The objects are made the same as their __init__ would (then given their fields), with
+    #the items they hold given after, since they can hold objects made after them
+    for number, obj in enumerate(world['objects']):
+        kind = obj[0]
+
+        if kind == 'ROOM':
+            objects.append(new_object(Room, exits=[None] * len(DIRECTIONS), _visited=False, start_text_shown=False,
+                                      player_here=False, name=obj[1], description=obj[2], room_start_text=obj[3]))
+
+        elif kind == 'ITEM':
+            objects.append(new_object(Item, name=obj[1], description=obj[2], attributes=list(obj[3]),
+                                      room_name=obj[4], collectable=obj[5], uses={}))
+
+        elif kind == 'CONTAINER': #Empty or not, the same as update_state
+            attributes = [x for x in obj[3] if x != 'empty'] if number in held else list(obj[3]) + ['empty']
+            objects.append(new_object(Container, name=obj[1], description=obj[2], attributes=attributes,
+                                      room_name=obj[4], collectable=obj[5], is_open=obj[6], uses={}))
+
+        else: #Actor
+            objects.append(new_object(Actor, name=obj[1], description=obj[2], room_name=obj[4], collectable=False,
+                                      accept_items=obj[5], loose_grip=obj[6], attributes=list(obj[3]), uses={}))
+
+    for number, obj in enumerate(objects):
+        if type(obj).__name__ != 'Item':
+            obj.__dict__['_items'] = ItemList([objects[x] for x in held.get(number, ())], obj)
+
+    #Both ways, the same as make_connect
+    for room, direct, target in world['connections']:
+        room, number = objects[room], DIRECTIONS.number(direct)
+        target = Transistion() if target == -1 else objects[target]
+        room.exits[number] = new_exit(target, room)
+        back = DIRECTIONS.opposites[number]
+
+        if back != None and type(target).__name__ == 'Room':
+            target.exits[back] = new_exit(room, target)
+
+    for room, direct, key in world['locks']:
+        objects[room].get_exit(DIRECTIONS.number(direct)).setup_lock(Item() if key == -1 else objects[key])
+
+    for holder, condition, held_item, action, arguments in world['events']:
+        depends = ['items'] if condition == 'HOLDS' else ['visited']
+        objects[holder].subscribe(make_event(objects, condition, held_item, action, arguments), depends)
+
+    player = None
+    if world['player'] != None:
+        name, description, items = world['player']
+        player = Player(name, description, [objects[x] for x in items])
+
+    maps = [End(x) if type(x).__name__ == 'str' else objects[x] for x in world['maps']]
+    return maps, player
+
+def load_world(game, file_name):
+    """Adds the maps of the world in this file (or compiled file) to the game, gives back
+    the player (or none, if the world doesn't have one)."""
+    maps, player = build_world(load_world_data(file_name))
+
+    for graph in maps:
+        game.add_map(graph)
+
+    return player
+
+def load_world_map(file_name, game):
+    """Gives back the map of the world in this file (for map loaders, see Game.py). The world
+    can only have the one map, and no player, whole worlds are loaded with load_world."""
+    maps, player = build_world(load_world_data(file_name))
+
+    if len(maps) != 1 or player != None:
+        print("--{} has {} maps{}, only worlds of one map (and no player) can be added as a map, load it with load_world--".format(
+            file_name, len(maps), " and a player" if player != None else ""))
+        raise SystemExit
+
+    return maps[0]
+
+if __name__ == '__main__':
+    import sys
+
+    #Compile a world file into a world that can be shipped on it's own
+    if len(sys.argv) < 2:
+        print("Compile a world with 'python worldParser.py name.world [name.worldc]'")
+        raise SystemExit
+
+    save_world(read_world(sys.argv[1]), sys.argv[2] if len(sys.argv) > 2 else sys.argv[1] + 'c')